@@ -3,7 +3,8 @@
 
 Behavior:
 - For each .md in content/, compute normalized body (strip frontmatter, collapse whitespace).
-- Group files by normalized body. For groups with >1 file:
+- Group files by a BLAKE2 digest of the normalized body; only the digest, body length
+  and parsed frontmatter are kept per file. For groups with >1 file:
   - Choose canonical file (longest body length).
   - For other files, replace content with frontmatter:
     - keep/merge created & layer & scope if present
@@ -15,10 +16,11 @@ Behavior:
 - Write a report to .ops/dedup_applied.md
 """
 from pathlib import Path
-import re
 import yaml
 import datetime
 
+from dedup_clusters import body_digest
+
 CONTENT = Path('content')
 REPORT = Path('ops') / 'dedup_applied.md'
 TODAY = datetime.date.today().isoformat()
@@ -47,29 +49,27 @@ def parse_frontmatter(text):
 def build_frontmatter(d):
     return '---\n' + yaml.safe_dump(d, allow_unicode=True, sort_keys=False) + '---\n'
 
-# gather files
+# gather files: one pass, bucket by digest of the normalized body
 md_files = list(CONTENT.rglob('*.md'))
-norm_map = {}
+digest_map = {}
 orig_meta = {}
 
 for p in md_files:
-    text = read_text(p)
-    fm, body = parse_frontmatter(text)
-    # normalized body
-    nb = re.sub(r'\s+', ' ', body).strip()
-    key = nb
-    norm_map.setdefault(key, []).append(p)
+    fm, body = parse_frontmatter(read_text(p))
+    # normalized body (collapsed whitespace); only its digest and length are kept
+    nb = ' '.join(body.split())
+    digest_map.setdefault(body_digest(nb), []).append((p, len(nb)))
     orig_meta[str(p)] = fm
 
 # find exact groups
-groups = [g for g in norm_map.values() if len(g) > 1]
+groups = [g for g in digest_map.values() if len(g) > 1]
 report_lines = ["# Applied dedup stubs report\n"]
 report_lines.append(f"Found {len(groups)} exact duplicate clusters")
 changed = []
 
-for idx, group in enumerate(groups, 1):
+for idx, sizes in enumerate(groups, 1):
     # choose canonical = largest file body length
-    sizes = [(p, len(re.sub(r'\s+',' ', parse_frontmatter(read_text(p))[1]).strip())) for p in group]
+    group = [p for p, _ in sizes]
     canonical = max(sizes, key=lambda x: x[1])[0]
     report_lines.append(f"\n## Cluster {idx}: {len(group)} files")
     report_lines.append(f"Canonical: {canonical}")
@@ -80,8 +80,8 @@ for idx, group in enumerate(groups, 1):
     for p,l in sizes:
         if p == canonical:
             continue
-        # get meta of duplicate
-        fm_dup, body_dup = parse_frontmatter(read_text(p))
+        # get meta of duplicate (parsed in the first pass)
+        fm_dup = orig_meta[str(p)]
         # record alias name (basename without ext)
         aliases.add(p.stem)
         # prepare stub frontmatter
@@ -25,6 +25,8 @@
     --ai-analysis           - Использовать Claude для AI-анализа
     --dry-run               - Не сохранять файлы, только вывести
     --output, -o            - Указать путь для сохранения
+    --no-cache              - Не использовать кэш разобранных документов
+    --jobs, -j N            - Разбирать документы в N процессах (0 — по числу ядер)
 """
 
 import os
@@ -33,13 +35,17 @@ import sys
 import json
 import yaml
 import argparse
+import pickle
 import hashlib
 import subprocess
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from collections import defaultdict
 from typing import Dict, List, Optional, Tuple, Any
 
+from git_objects import GitObjectReader, BlobMetricsCache, count_snapshot_metrics
+
 # Загрузка переменных окружения из .env файла
 try:
     from dotenv import load_dotenv
@@ -57,6 +63,10 @@ except ImportError:
 # Константы
 CONTENT_DIR = Path("content")
 REPORTS_DIR = CONTENT_DIR / "0. Управление" / "0.4. Автоматические отчёты ИИ" / "0.4.2. Актуальные автоматические отчеты"
+CACHE_DIR = Path(".ops") / ".cache"
+DOCUMENT_CACHE_FILE = CACHE_DIR / "documents.pickle"
+# Увеличивать при изменении логики разбора (Document._parse, FOLDER_TO_FAMILY)
+DOCUMENT_CACHE_VERSION = 1
 
 # Семейства документов F0-F9
 FAMILIES = {
@@ -302,10 +312,100 @@ FOLDER_TO_FAMILY = {
 }
 
 
+class DocumentCache:
+    """Кэш разобранных документов на диске.
+
+    Для каждого файла хранится результат разбора: frontmatter, смещения тела,
+    wikilinks, заголовки и семейство. Запись считается актуальной, если
+    совпадают mtime и размер файла; иначе сверяется хэш содержимого
+    (например, после свежего checkout в CI), и только при его изменении
+    документ разбирается заново.
+    """
+
+    def __init__(self, path: Path = DOCUMENT_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.seen: set = set()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️  Кэш документов повреждён, будет пересоздан: {e}")
+            return
+        if isinstance(data, dict) and data.get("version") == DOCUMENT_CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str, stat: os.stat_result, content: str) -> Optional[Dict[str, Any]]:
+        """Поиск актуальной записи для файла."""
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["file_size"] == stat.st_size:
+            self.hits += 1
+            return entry["record"]
+
+        if entry["sha1"] == self.content_hash(content):
+            # Содержимое не изменилось, обновляем только метаданные файла
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["file_size"] = stat.st_size
+            self._dirty = True
+            self.hits += 1
+            return entry["record"]
+
+        self.misses += 1
+        return None
+
+    def store(self, key: str, stat: os.stat_result, content: str, record: Dict[str, Any]):
+        """Сохранение результата разбора файла."""
+        self.seen.add(key)
+        self.entries[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "file_size": stat.st_size,
+            "sha1": self.content_hash(content),
+            "record": record,
+        }
+        self._dirty = True
+
+    def save(self):
+        """Запись кэша на диск (записи удалённых файлов отбрасываются)."""
+        stale = set(self.entries) - self.seen
+        for key in stale:
+            del self.entries[key]
+        if not self._dirty and not stale:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"version": DOCUMENT_CACHE_VERSION, "entries": self.entries}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(self.path)
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️  Не удалось сохранить кэш документов: {e}")
+
+
 class Document:
     """Представление документа хранилища."""
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, cache: Optional[DocumentCache] = None,
+                 content: Optional[str] = None, record: Optional[Dict[str, Any]] = None):
         self.path = path
         self.relative_path = path.relative_to(CONTENT_DIR) if path.is_relative_to(CONTENT_DIR) else path
         self.name = path.stem
@@ -316,46 +416,87 @@ class Document:
         self.headings: List[Tuple[int, str]] = []
         self.family: Optional[str] = None
         self.size = 0
-        self._parse()
+        self.record: Dict[str, Any] = {}
 
-    def _parse(self):
+        if content is not None:
+            # Содержимое уже прочитано (параллельное сканирование)
+            self.content = content
+            self.size = len(content)
+            self._apply_record(record if record is not None else self._parse_content())
+        else:
+            self._parse(cache)
+
+    def _parse(self, cache: Optional[DocumentCache] = None):
         """Парсинг документа: frontmatter, контент, ссылки."""
         try:
+            stat = self.path.stat()
             self.content = self.path.read_text(encoding="utf-8")
             self.size = len(self.content)
         except Exception as e:
             print(f"⚠️  Ошибка чтения {self.path}: {e}")
             return
 
+        if cache is not None:
+            key = str(self.path)
+            record = cache.lookup(key, stat, self.content)
+            if record is None:
+                record = self._parse_content()
+                cache.store(key, stat, self.content, record)
+        else:
+            record = self._parse_content()
+
+        self._apply_record(record)
+
+    def _parse_content(self) -> Dict[str, Any]:
+        """Разбор содержимого в запись: frontmatter, смещения тела, ссылки, заголовки, семейство."""
+        frontmatter: Dict[str, Any] = {}
+        body_start, body_end = 0, len(self.content)
+
         # Парсинг frontmatter
         if self.content.startswith("---"):
             parts = self.content.split("---", 2)
             if len(parts) >= 3:
                 try:
-                    self.frontmatter = yaml.safe_load(parts[1]) or {}
+                    frontmatter = yaml.safe_load(parts[1]) or {}
                 except yaml.YAMLError:
-                    self.frontmatter = {}
-                self.body = parts[2].strip()
-            else:
-                self.body = self.content
-        else:
-            self.body = self.content
+                    frontmatter = {}
+                raw_body = parts[2]
+                offset = len(parts[0]) + len(parts[1]) + 6
+                body_start = offset + len(raw_body) - len(raw_body.lstrip())
+                body_end = body_start + len(raw_body.strip())
+
+        body = self.content[body_start:body_end]
 
         # Извлечение wikilinks
-        self.wikilinks = re.findall(r'\[\[([^\]|]+)(?:\|[^\]]+)?\]\]', self.body)
+        wikilinks = re.findall(r'\[\[([^\]|]+)(?:\|[^\]]+)?\]\]', body)
 
         # Извлечение заголовков
-        self.headings = [(len(m.group(1)), m.group(2))
-                         for m in re.finditer(r'^(#{1,6})\s+(.+)$', self.body, re.MULTILINE)]
+        headings = [(len(m.group(1)), m.group(2))
+                    for m in re.finditer(r'^(#{1,6})\s+(.+)$', body, re.MULTILINE)]
+
+        return {
+            "frontmatter": frontmatter,
+            "body_start": body_start,
+            "body_end": body_end,
+            "wikilinks": wikilinks,
+            "headings": headings,
+            "family": self._detect_family(frontmatter),
+        }
 
-        # Определение семейства
-        self.family = self._detect_family()
+    def _apply_record(self, record: Dict[str, Any]):
+        """Заполнение полей документа из записи разбора."""
+        self.record = record
+        self.frontmatter = record["frontmatter"]
+        self.body = self.content[record["body_start"]:record["body_end"]]
+        self.wikilinks = list(record["wikilinks"])
+        self.headings = list(record["headings"])
+        self.family = record["family"]
 
-    def _detect_family(self) -> Optional[str]:
+    def _detect_family(self, frontmatter: Dict[str, Any]) -> Optional[str]:
         """Определение семейства документа по пути и frontmatter."""
         # Приоритет: frontmatter
-        if "family" in self.frontmatter:
-            return self.frontmatter["family"]
+        if "family" in frontmatter:
+            return frontmatter["family"]
 
         # По пути
         path_str = str(self.relative_path)
@@ -434,6 +575,12 @@ class Document:
         return self.frontmatter.get("type", "unknown")
 
 
+def _parse_document_worker(task: Tuple[str, str]) -> Dict[str, Any]:
+    """Разбор документа в дочернем процессе. Возвращает только запись разбора (picklable)."""
+    path_str, content = task
+    return Document(Path(path_str), content=content).record
+
+
 class ReportGenerator:
     """Базовый класс для генерации отчётов."""
 
@@ -470,6 +617,7 @@ class ReportGenerator:
         from datetime import timedelta
 
         metrics = []
+        snapshots: List[Tuple[str, str, str]] = []  # (неделя, дата, коммит)
         today = datetime.now()
 
         # Получаем дату первого коммита для определения доступной истории
@@ -515,40 +663,8 @@ class ReportGenerator:
                 if not commit_hash:
                     continue
 
-                # Получаем список .md файлов в content/ на этот коммит
-                # Используем -c core.quotepath=false для корректной работы с кириллицей
-                result = subprocess.run(
-                    f"git -c core.quotepath=false ls-tree -r --name-only {commit_hash} -- content/ | grep '\\.md$'",
-                    shell=True, capture_output=True, text=True
-                )
-                md_files = [f for f in result.stdout.strip().split('\n') if f]
-
-                total_files = len(md_files)
-                total_lines = 0
-                total_chars = 0
-
-                # Подсчитываем строки и символы
-                for file_path in md_files:
-                    try:
-                        result = subprocess.run(
-                            ["git", "show", f"{commit_hash}:{file_path}"],
-                            capture_output=True, text=True
-                        )
-                        if result.returncode == 0:
-                            content = result.stdout
-                            total_lines += len(content.split('\n'))
-                            total_chars += len(content)
-                    except:
-                        pass
-
-                metrics.append({
-                    'week': f"W-{week_offset}",
-                    'date': date_str,
-                    'files': total_files,
-                    'lines': total_lines,
-                    'chars': total_chars
-                })
-            except Exception as e:
+                snapshots.append((f"W-{week_offset}", date_str, commit_hash))
+            except Exception:
                 continue
 
         # Добавляем текущее состояние (Сейчас)
@@ -557,63 +673,103 @@ class ReportGenerator:
                 ["git", "rev-parse", "HEAD"],
                 capture_output=True, text=True, check=True
             )
-            commit_hash = result.stdout.strip()
-
-            # Используем -c core.quotepath=false для корректной работы с кириллицей
-            result = subprocess.run(
-                f"git -c core.quotepath=false ls-tree -r --name-only {commit_hash} -- content/ | grep '\\.md$'",
-                shell=True, capture_output=True, text=True
-            )
-            md_files = [f for f in result.stdout.strip().split('\n') if f]
+            snapshots.append(("Сейчас", today.strftime("%Y-%m-%d"), result.stdout.strip()))
+        except Exception:
+            pass
 
-            total_files = len(md_files)
-            total_lines = 0
-            total_chars = 0
+        # Содержимое блобов читаем одним процессом git cat-file --batch;
+        # метрики блоба (по SHA) берутся из постоянного кэша и считаются один раз
+        blob_cache = BlobMetricsCache()
+        try:
+            reader = GitObjectReader()
+        except OSError:
+            return []
 
-            for file_path in md_files:
+        with reader:
+            for week, date_str, commit_hash in snapshots:
                 try:
-                    result = subprocess.run(
-                        ["git", "show", f"{commit_hash}:{file_path}"],
-                        capture_output=True, text=True
-                    )
-                    if result.returncode == 0:
-                        content = result.stdout
-                        total_lines += len(content.split('\n'))
-                        total_chars += len(content)
-                except:
-                    pass
-
-            metrics.append({
-                'week': "Сейчас",
-                'date': today.strftime("%Y-%m-%d"),
-                'files': total_files,
-                'lines': total_lines,
-                'chars': total_chars
-            })
-        except:
-            pass
+                    data = count_snapshot_metrics(commit_hash, reader, blob_cache, path="content/")
+                except subprocess.CalledProcessError:
+                    continue
+
+                metrics.append({'week': week, 'date': date_str, **data})
+
+        blob_cache.save()
 
         return metrics
 
-    def scan_documents(self):
-        """Сканирование всех документов в хранилище."""
+    def scan_documents(self, use_cache: bool = True, jobs: int = 1):
+        """Сканирование всех документов в хранилище.
+
+        Документы упорядочиваются по пути, поэтому результат не зависит
+        от числа процессов (jobs) и порядка обхода файловой системы.
+        """
         print("📂 Сканирование документов...")
 
-        for md_file in CONTENT_DIR.rglob("*.md"):
-            # Пропускаем служебные файлы
-            if any(skip in str(md_file) for skip in [".obsidian", "node_modules", ".git"]):
-                continue
+        cache = DocumentCache() if use_cache else None
+
+        # Пропускаем служебные файлы
+        md_files = sorted(
+            md_file for md_file in CONTENT_DIR.rglob("*.md")
+            if not any(skip in str(md_file) for skip in [".obsidian", "node_modules", ".git"])
+        )
 
-            doc = Document(md_file)
-            self.documents.append(doc)
+        if jobs > 1:
+            self.documents = self._scan_parallel(md_files, cache, jobs)
+        else:
+            self.documents = [Document(md_file, cache=cache) for md_file in md_files]
 
+        for doc in self.documents:
             if doc.family:
                 self.by_family[doc.family].append(doc)
 
+        if cache is not None:
+            cache.save()
+            print(f"   Кэш: {cache.hits} из кэша, {cache.misses} разобрано заново")
+
         print(f"   Найдено документов: {len(self.documents)}")
         for family, docs in sorted(self.by_family.items()):
             print(f"   {family}: {len(docs)}")
 
+    def _scan_parallel(self, md_files: List[Path], cache: Optional[DocumentCache], jobs: int) -> List[Document]:
+        """Разбор документов в пуле процессов.
+
+        Чтение файлов и проверка кэша выполняются в основном процессе,
+        в пул отправляется только разбор изменившихся документов.
+        """
+        docs: Dict[Path, Document] = {}
+        pending: List[Tuple[Path, os.stat_result, str]] = []
+
+        for md_file in md_files:
+            try:
+                stat = md_file.stat()
+                content = md_file.read_text(encoding="utf-8")
+            except Exception:
+                docs[md_file] = Document(md_file)  # выведет предупреждение об ошибке чтения
+                continue
+
+            record = cache.lookup(str(md_file), stat, content) if cache is not None else None
+            if record is not None:
+                docs[md_file] = Document(md_file, content=content, record=record)
+            else:
+                pending.append((md_file, stat, content))
+
+        if pending:
+            print(f"   Разбор {len(pending)} документов в {jobs} процессах...")
+            chunksize = max(1, len(pending) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                records = pool.map(
+                    _parse_document_worker,
+                    [(str(md_file), content) for md_file, _, content in pending],
+                    chunksize=chunksize,
+                )
+                for (md_file, stat, content), record in zip(pending, records):
+                    if cache is not None:
+                        cache.store(str(md_file), stat, content, record)
+                    docs[md_file] = Document(md_file, content=content, record=record)
+
+        return [docs[md_file] for md_file in md_files]
+
     def generate(self, report_type: str) -> str:
         """Генерация отчёта указанного типа."""
         generators = {
@@ -2137,8 +2293,21 @@ def main():
         action="store_true",
         help="Использовать AI (Claude) для анализа терминологии и рекомендаций"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Не использовать кэш разобранных документов ({DOCUMENT_CACHE_FILE})"
+    )
+
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Число процессов для разбора документов (0 — по числу ядер, по умолчанию: 1)"
+    )
 
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     # Проверяем, что запущено из корня проекта
     if not CONTENT_DIR.exists():
@@ -2156,7 +2325,7 @@ def main():
             print("   Продолжаем без AI-анализа...")
 
     generator = ReportGenerator(ai_analyzer=ai_analyzer)
-    generator.scan_documents()
+    generator.scan_documents(use_cache=not args.no_cache, jobs=jobs)
 
     report_files = {
         "architecture-snapshot": "Архитектурный слепок хранилища 0.4.md",
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Near-duplicate clustering shared by the dedup scripts.
+
+Used by `.ops/deduplicate_content.py`, `.ops/mark_dedup_review.py` and the
+`_debug_*` helpers so that all of them produce the same clusters.
+
+Pipeline:
+1. bodies are read without frontmatter and whitespace-collapsed (`load_bodies`);
+2. every body of at least MIN_LEN chars gets a MinHash signature over word
+   shingles, and LSH banding proposes candidate pairs (`candidate_pairs`);
+3. candidates are verified with the exact difflib ratio against THRESHOLD
+   (`is_similar`);
+4. verified pairs are merged with union-find, so a cluster is a connected
+   component of the similarity graph (`find_clusters`).
+
+Fingerprints (normalized-body digest, length, MinHash signature) are persisted
+in `.ops/.cache/dedup_index.json` (`FingerprintIndex`). Signatures are keyed by
+the body digest, so unchanged documents are never re-hashed, and
+`find_near_duplicates_of` compares only new/changed documents against the index.
+
+Usage:
+    from dedup_clusters import load_bodies, find_clusters
+    bodies = load_bodies(Path('content'))
+    clusters = find_clusters(bodies)
+
+    index = FingerprintIndex()
+    changed = index.refresh(Path('content'))
+    pairs = find_near_duplicates_of(changed, index)
+    index.save()
+"""
+from pathlib import Path
+from collections import defaultdict
+import difflib
+import hashlib
+import json
+import re
+
+MIN_LEN = 200  # skip very short files
+THRESHOLD = 0.65
+
+# MinHash / LSH parameters. One-permutation hashing: every shingle hash lands in
+# one of NUM_PERM bins and each bin keeps its minimum. With LSH_BANDS bands of
+# NUM_PERM // LSH_BANDS rows, pairs with shingle Jaccard above ~0.3 become
+# candidates, which is deliberately lenient relative to THRESHOLD.
+SHINGLE_SIZE = 3
+NUM_PERM = 120
+LSH_BANDS = 40
+
+INDEX_FILE = Path(__file__).resolve().parent / '.cache' / 'dedup_index.json'
+# bump when normalization, shingling or MinHash parameters change
+INDEX_VERSION = 1
+
+
+def read_body(p: Path):
+    """Document body without YAML frontmatter."""
+    txt = p.read_text(encoding='utf-8')
+    if txt.startswith('---'):
+        parts = txt.split('---', 2)
+        if len(parts) >= 3:
+            return parts[2].strip()
+    return txt.strip()
+
+
+def normalize_body(body: str) -> str:
+    return re.sub(r'\s+', ' ', body)
+
+
+def load_bodies(content: Path):
+    """Normalized bodies of all markdown files under `content`, keyed by path string (sorted)."""
+    return {str(p): normalize_body(read_body(p)) for p in sorted(content.rglob('*.md'), key=str)}
+
+
+def body_digest(body: str) -> str:
+    return hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def minhash_signature(text: str):
+    """One-permutation MinHash signature of the word shingles of `text`."""
+    words = text.lower().split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = {' '.join(words)}
+    else:
+        shingles = {' '.join(words[k:k + SHINGLE_SIZE]) for k in range(len(words) - SHINGLE_SIZE + 1)}
+
+    empty = 1 << 64
+    signature = [empty] * NUM_PERM
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        value, slot = divmod(h, NUM_PERM)
+        if value < signature[slot]:
+            signature[slot] = value
+
+    # densify empty bins by borrowing from the next non-empty bin (rotation)
+    filled = [k for k in range(NUM_PERM) if signature[k] != empty]
+    if filled and len(filled) < NUM_PERM:
+        dense = list(signature)
+        for k in range(NUM_PERM):
+            if signature[k] == empty:
+                distance = next(d for d in range(1, NUM_PERM) if signature[(k + d) % NUM_PERM] != empty)
+                dense[k] = signature[(k + distance) % NUM_PERM] + distance * empty
+        signature = dense
+    return signature
+
+
+def lsh_buckets(signature):
+    """LSH bucket ids (band number + band rows) of a signature."""
+    rows = NUM_PERM // LSH_BANDS
+    return [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(LSH_BANDS)]
+
+
+def candidate_pairs(signatures: dict):
+    """Pairs of keys that share at least one LSH band bucket, as {key: {other keys}}."""
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        for bucket in lsh_buckets(signature):
+            buckets[bucket].append(key)
+
+    candidates = defaultdict(set)
+    for bucket in buckets.values():
+        if len(bucket) > 1:
+            for x in bucket:
+                candidates[x].update(bucket)
+    for key, others in candidates.items():
+        others.discard(key)
+    return candidates
+
+
+def is_similar(a: str, b: str) -> bool:
+    """Exact check `SequenceMatcher(None, a, b).ratio() >= THRESHOLD` with cheap upper bounds first."""
+    matcher = difflib.SequenceMatcher(None, a, b)
+    return (matcher.real_quick_ratio() >= THRESHOLD
+            and matcher.quick_ratio() >= THRESHOLD
+            and matcher.ratio() >= THRESHOLD)
+
+
+class UnionFind:
+    """Disjoint sets over arbitrary hashable items (path compression + union by size)."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        self.size.setdefault(x, 1)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+
+def find_clusters(bodies: dict, signatures: dict = None):
+    """Clusters (lists of keys of size > 1) of near-duplicate bodies.
+
+    Clusters and their members are ordered by the order of `bodies`.
+    Precomputed MinHash signatures may be passed in `signatures`.
+    """
+    order = {key: i for i, key in enumerate(bodies)}
+    eligible = [key for key, body in bodies.items() if len(body) >= MIN_LEN]
+    if signatures is None:
+        signatures = {}
+    signatures = {key: signatures.get(key) or minhash_signature(bodies[key]) for key in eligible}
+
+    candidates = candidate_pairs(signatures)
+    uf = UnionFind()
+    for key in eligible:
+        for other in sorted(candidates.get(key, ()), key=order.get):
+            if order[other] <= order[key] or uf.find(key) == uf.find(other):
+                continue
+            if is_similar(bodies[key], bodies[other]):
+                uf.union(key, other)
+
+    groups = defaultdict(list)
+    for key in eligible:
+        groups[uf.find(key)].append(key)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+class FingerprintIndex:
+    """Persisted fingerprints of the documents under content/.
+
+    `files` maps a path to its mtime/size and normalized-body digest;
+    `fingerprints` maps a digest to the body length and MinHash signature
+    (None for bodies shorter than MIN_LEN).
+    """
+
+    def __init__(self, path: Path = INDEX_FILE):
+        self.path = path
+        self.files = {}
+        self.fingerprints = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                data = {}
+            if data.get('version') == INDEX_VERSION:
+                self.files = data.get('files', {})
+                self.fingerprints = data.get('fingerprints', {})
+
+    def add(self, key: str, body: str, stat=None):
+        """Record `body` for `key`; returns True if its digest differs from the stored one."""
+        digest = body_digest(body)
+        if digest not in self.fingerprints:
+            signature = minhash_signature(body) if len(body) >= MIN_LEN else None
+            self.fingerprints[digest] = {'length': len(body), 'signature': signature}
+        entry = self.files.get(key)
+        changed = entry is None or entry['digest'] != digest
+        self.files[key] = {
+            'mtime_ns': stat.st_mtime_ns if stat else None,
+            'size': stat.st_size if stat else None,
+            'digest': digest,
+        }
+        return changed
+
+    def refresh(self, content: Path, bodies: dict = None):
+        """Sync the index with `content`; returns keys of new or changed documents.
+
+        Files whose mtime and size match the index are not read. Pass `bodies`
+        (from `load_bodies`) to reuse already loaded texts.
+        """
+        changed = []
+        seen = set()
+        for p in sorted(content.rglob('*.md'), key=str):
+            key = str(p)
+            seen.add(key)
+            stat = p.stat()
+            entry = self.files.get(key)
+            if (bodies is None and entry is not None
+                    and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size):
+                continue
+            body = bodies[key] if bodies is not None and key in bodies else normalize_body(read_body(p))
+            if self.add(key, body, stat):
+                changed.append(key)
+        for key in set(self.files) - seen:
+            del self.files[key]
+        return changed
+
+    def signatures(self):
+        """MinHash signatures of all indexed documents long enough to compare."""
+        result = {}
+        for key, entry in self.files.items():
+            signature = self.fingerprints[entry['digest']]['signature']
+            if signature is not None:
+                result[key] = signature
+        return result
+
+    def save(self):
+        used = {entry['digest'] for entry in self.files.values()}
+        self.fingerprints = {d: fp for d, fp in self.fingerprints.items() if d in used}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({
+            'version': INDEX_VERSION,
+            'files': self.files,
+            'fingerprints': self.fingerprints,
+        }, separators=(',', ':')), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+
+def find_near_duplicates_of(keys, index: FingerprintIndex):
+    """Near-duplicate pairs (key, other) between `keys` and every indexed document.
+
+    Only LSH candidates of `keys` are read from disk and verified, so the cost
+    scales with the number of changed documents, not with the whole vault.
+    """
+    signatures = index.signatures()
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        for bucket in lsh_buckets(signature):
+            buckets[bucket].append(key)
+
+    bodies = {}
+
+    def body(key):
+        if key not in bodies:
+            bodies[key] = normalize_body(read_body(Path(key)))
+        return bodies[key]
+
+    keys = set(keys)
+    pairs = []
+    for key in sorted(keys):
+        signature = signatures.get(key)
+        if signature is None:
+            continue
+        candidates = set()
+        for bucket in lsh_buckets(signature):
+            candidates.update(buckets[bucket])
+        candidates.discard(key)
+        for other in sorted(candidates):
+            if other in keys and other < key:
+                continue  # already checked from the other side
+            # same argument order as find_clusters (sorted path order)
+            first, second = sorted((key, other))
+            if is_similar(body(first), body(second)):
+                pairs.append((key, other))
+    return pairs
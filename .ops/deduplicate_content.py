@@ -2,61 +2,61 @@
 """Detect near-duplicate Markdown documents in content/ using difflib similarity.
 Outputs a report `.ops/dedup_report.md` with clusters and a recommended canonical file per cluster.
 
-Usage: python .ops/deduplicate_content.py
+Clustering lives in `.ops/dedup_clusters.py`: MinHash + LSH banding proposes
+candidate pairs, candidates are verified with the exact difflib ratio against
+THRESHOLD, and verified pairs are merged into clusters with union-find.
+
+Fingerprints are kept in `.ops/.cache/dedup_index.json`. With --incremental
+only documents that are new or changed since the last run are compared against
+the index; near-duplicate pairs are printed and the exit code is 1 if any exist.
+With --update-index the index is only synced with content/ (no comparison),
+e.g. to seed it from the base branch before an incremental check in CI.
+
+Usage: python .ops/deduplicate_content.py [--incremental | --update-index]
 """
 from pathlib import Path
-import difflib
-import re
+import argparse
+import sys
+
+from dedup_clusters import (MIN_LEN, THRESHOLD, FingerprintIndex, load_bodies, find_clusters,
+                            find_near_duplicates_of)
 
 CONTENT = Path('content')
 REPORT = Path('ops') / 'dedup_report.md'
-MIN_LEN = 200  # skip very short files
-THRESHOLD = 0.65
 
-# read all md files
-md_files = list(CONTENT.rglob('*.md'))
-print(f'Found {len(md_files)} markdown files under content/')
+parser = argparse.ArgumentParser(description='Detect near-duplicate Markdown documents')
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument('--incremental', action='store_true',
+                  help='compare only new/changed documents against the stored fingerprint index')
+mode.add_argument('--update-index', action='store_true',
+                  help='sync the fingerprint index with content/ without comparing documents')
+args = parser.parse_args()
+
+index = FingerprintIndex()
 
-# helper to extract body (strip frontmatter)
-def read_body(p: Path):
-    txt = p.read_text(encoding='utf-8')
-    if txt.startswith('---'):
-        parts = txt.split('---', 2)
-        if len(parts) >= 3:
-            return parts[2].strip()
-    return txt.strip()
+if args.update_index:
+    changed = index.refresh(CONTENT)
+    index.save()
+    print(f'Indexed {len(index.files)} documents ({len(changed)} new or changed)')
+    sys.exit(0)
 
-bodies = {}
-for p in md_files:
-    body = read_body(p)
-    bodies[str(p)] = re.sub(r'\s+', ' ', body)
+if args.incremental:
+    changed = index.refresh(CONTENT)
+    print(f'Changed documents since last index: {len(changed)}')
+    pairs = find_near_duplicates_of(changed, index)
+    index.save()
+    for key, other in pairs:
+        print(f'Near-duplicate: {key} <-> {other}')
+    print(f'Found {len(pairs)} near-duplicate pairs')
+    sys.exit(1 if pairs else 0)
 
-# compute pairwise similarities (upper-triangular)
-paths = list(bodies.keys())
-N = len(paths)
-clusters = []
-visited = set()
+bodies = load_bodies(CONTENT)
+N = len(bodies)
+print(f'Found {N} markdown files under content/')
 
-for i in range(N):
-    if paths[i] in visited:
-        continue
-    a = bodies[paths[i]]
-    if len(a) < MIN_LEN:
-        continue
-    group = [paths[i]]
-    visited.add(paths[i])
-    for j in range(i+1, N):
-        if paths[j] in visited:
-            continue
-        b = bodies[paths[j]]
-        if len(b) < MIN_LEN:
-            continue
-        ratio = difflib.SequenceMatcher(None, a, b).ratio()
-        if ratio >= THRESHOLD:
-            group.append(paths[j])
-            visited.add(paths[j])
-    if len(group) > 1:
-        clusters.append(group)
+index.refresh(CONTENT, bodies)
+clusters = find_clusters(bodies, index.signatures())
+index.save()
 
 # refine clusters by picking canonical (largest body length) and compute sizes
 report_lines = ["# Дедупликация контента — отчёт\n"]
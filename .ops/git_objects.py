@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Чтение объектов git без запуска отдельного процесса на каждый файл.
+
+Используется скриптами метрик роста (build_report.py, repo_growth_metrics.py)
+вместо цикла `git show <commit>:<path>`: содержимое всех блобов читается
+через один долгоживущий процесс `git cat-file --batch`, а список файлов
+снимка — через `git ls-tree -r -z`, который сразу отдаёт SHA блобов.
+Изменения между снимками — через `git diff-tree -r -z` (diff_tree_blobs).
+
+Блоб git неизменяем, поэтому его число строк и символов вычисляется
+один раз за всё время жизни репозитория и хранится в BlobMetricsCache
+(.ops/.cache/blob_metrics.json). Метрики снимка — сумма по ls-tree.
+
+Пример:
+    cache = BlobMetricsCache()
+    with GitObjectReader() as reader:
+        metrics = count_snapshot_metrics("HEAD", reader, cache, path="content/")
+    cache.save()
+"""
+
+import json
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BLOB_METRICS_CACHE_FILE = Path(__file__).resolve().parent / ".cache" / "blob_metrics.json"
+# Увеличивать при изменении правил подсчёта в blob_text_metrics
+BLOB_METRICS_CACHE_VERSION = 1
+
+
+class GitObjectReader:
+    """Поток `git cat-file --batch`: один процесс на все запрашиваемые объекты."""
+
+    def __init__(self, repo: str = "."):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, rev: str) -> Optional[bytes]:
+        """Содержимое объекта (SHA или `<commit>:<path>`), None если объект не найден."""
+        self.proc.stdin.write(rev.encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+
+        header = self.proc.stdout.readline()
+        parts = header.split()
+        # Для отсутствующих объектов git отвечает "<rev> missing" / "<rev> ambiguous"
+        if len(parts) != 3:
+            return None
+
+        size = int(parts[2])
+        data = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)  # завершающий перевод строки
+        return data
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_tree_blobs(commit: str, path: Optional[str] = None, suffix: str = "") -> List[Tuple[str, str]]:
+    """Список (SHA блоба, путь) всех файлов снимка, отфильтрованный по окончанию пути."""
+    cmd = ["git", "ls-tree", "-r", "-z", commit]
+    if path:
+        cmd += ["--", path]
+    result = subprocess.run(cmd, capture_output=True, check=True)
+
+    blobs = []
+    for entry in result.stdout.decode("utf-8", errors="replace").split("\0"):
+        if not entry:
+            continue
+        meta, file_path = entry.split("\t", 1)
+        _, obj_type, sha = meta.split()
+        if obj_type == "blob" and file_path.endswith(suffix):
+            blobs.append((sha, file_path))
+    return blobs
+
+
+def diff_tree_blobs(old_commit: str, new_commit: str, path: Optional[str] = None,
+                    suffix: str = "") -> List[Tuple[Optional[str], Optional[str], str]]:
+    """Изменения файлов между двумя снимками: (SHA до или None, SHA после или None, путь)."""
+    cmd = ["git", "diff-tree", "-r", "-z", "--no-renames", old_commit, new_commit]
+    if path:
+        cmd += ["--", path]
+    result = subprocess.run(cmd, capture_output=True, check=True)
+
+    # Формат -z: ":<mode> <mode> <sha> <sha> <status>\0<path>\0"
+    fields = result.stdout.decode("utf-8", errors="replace").split("\0")
+    changes = []
+    for meta, file_path in zip(fields[0::2], fields[1::2]):
+        if not file_path.endswith(suffix):
+            continue
+        old_mode, new_mode, old_sha, new_sha, _ = meta.lstrip(":").split()
+        # 000000 — файла нет на этой стороне, 160000 — подмодуль (не блоб)
+        old_sha = old_sha if old_mode not in ("000000", "160000") else None
+        new_sha = new_sha if new_mode not in ("000000", "160000") else None
+        if old_sha or new_sha:
+            changes.append((old_sha, new_sha, file_path))
+    return changes
+
+
+def blob_text_metrics(data: bytes) -> Tuple[int, int]:
+    """Число строк и символов блоба так, как их считал `git show` в текстовом режиме."""
+    text = data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    return len(text.split("\n")), len(text)
+
+
+class BlobMetricsCache:
+    """Постоянный кэш: SHA блоба → (строк, символов)."""
+
+    def __init__(self, path: Path = BLOB_METRICS_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Tuple[int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Кэш метрик блобов повреждён, будет пересоздан: {e}")
+            return
+        if data.get("version") == BLOB_METRICS_CACHE_VERSION:
+            self.entries = {sha: tuple(value) for sha, value in data.get("blobs", {}).items()}
+
+    def get(self, sha: str, reader: GitObjectReader) -> Tuple[int, int]:
+        """Метрики блоба; блоб читается из git только при первом обращении."""
+        metrics = self.entries.get(sha)
+        if metrics is not None:
+            self.hits += 1
+            return metrics
+
+        self.misses += 1
+        data = reader.read(sha)
+        if data is None:
+            return (0, 0)
+        metrics = blob_text_metrics(data)
+        self.entries[sha] = metrics
+        return metrics
+
+    def save(self):
+        if not self.misses:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": BLOB_METRICS_CACHE_VERSION, "blobs": self.entries}, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.path)
+
+
+def count_snapshot_metrics(commit: str, reader: GitObjectReader, cache: BlobMetricsCache,
+                           path: Optional[str] = None, suffix: str = ".md") -> Dict[str, int]:
+    """Число файлов, строк и символов в снимке commit (сумма метрик блобов из ls-tree)."""
+    blobs = list_tree_blobs(commit, path, suffix=suffix)
+    total_lines = 0
+    total_chars = 0
+    for sha, _ in blobs:
+        lines, chars = cache.get(sha, reader)
+        total_lines += lines
+        total_chars += chars
+    return {
+        'files': len(blobs),
+        'lines': total_lines,
+        'chars': total_chars
+    }
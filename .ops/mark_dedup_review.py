@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 """Mark deduplication cluster candidates as review (variant C).
 
-Reads .ops/dedup_report.md to find clusters, selects a canonical file
-per cluster (longest body) and sets `status: review` and
-`suggested_canonical` in frontmatter for non-canonical files.
+Computes clusters with `.ops/dedup_clusters.py` (the same clustering as
+`.ops/deduplicate_content.py`), selects a canonical file per cluster
+(longest body) and sets `status: review` and `suggested_canonical` in
+frontmatter for non-canonical files.
 """
 from pathlib import Path
 import re
 import yaml
-import sys
+
+from dedup_clusters import load_bodies, find_clusters
 
 ROOT = Path(__file__).resolve().parents[1]
-REPORT = ROOT / 'ops' / 'dedup_report.md'
 
 
 def split_frontmatter(text):
@@ -34,50 +35,6 @@ def write_with_frontmatter(path: Path, fm: dict, body: str):
     path.write_text(content, encoding='utf-8')
 
 
-def parse_report(report_path: Path):
-    text = report_path.read_text(encoding='utf-8')
-    import re
-    # Parse cluster sizes from headers
-    counts = re.findall(r"##\s*Кластер\s*\d+\s*—\s*(\d+)\s*файлов", text)
-    cluster_counts = [int(c) for c in counts] if counts else []
-
-    # Find all content path-like fragments (allow wrapped lines)
-    raw_matches = re.findall(r"(content[\\/][\\s\\S]*?\\.md)", text, re.I)
-    norm = []
-    for m in raw_matches:
-        s = m.replace('|', ' ')
-        s = ' '.join(s.split())
-        s = s.replace('\\', '/')
-        idx = s.lower().find('.md')
-        if idx != -1:
-            s = s[:idx+3]
-            norm.append(Path(s.strip()))
-
-    # If we found cluster size hints, split normalized list accordingly, otherwise split into single cluster
-    clusters = []
-    if cluster_counts and sum(cluster_counts) <= len(norm):
-        i = 0
-        for cnt in cluster_counts:
-            group = norm[i:i+cnt]
-            # remove duplicates preserving order
-            uniq = []
-            for p in group:
-                if p not in uniq:
-                    uniq.append(p)
-            if uniq:
-                clusters.append(uniq)
-            i += cnt
-    else:
-        if norm:
-            # fallback: group all into a single cluster list
-            uniq = []
-            for p in norm:
-                if p not in uniq:
-                    uniq.append(p)
-            clusters.append(uniq)
-    return clusters
-
-
 def body_length(path: Path):
     if not path.exists():
         return 0
@@ -95,51 +52,8 @@ def ensure_frontmatter(path: Path):
 
 
 def main():
-    # Try to parse report first; if parsing yields no clusters, recompute clusters directly.
-    clusters = []
-    if REPORT.exists():
-        try:
-            clusters = parse_report(REPORT)
-        except Exception:
-            clusters = []
-
-    if not clusters:
-        # recompute clusters using the same algorithm as .ops/deduplicate_content.py
-        from difflib import SequenceMatcher
-        MIN_LEN = 200
-        THRESHOLD = 0.65
-        md_files = list((ROOT / 'content').rglob('*.md'))
-        def read_body(p: Path):
-            txt = p.read_text(encoding='utf-8')
-            if txt.startswith('---'):
-                parts = txt.split('---', 2)
-                if len(parts) >= 3:
-                    return parts[2].strip()
-            return txt.strip()
-        bodies = {str(p): re.sub(r"\s+", ' ', read_body(p)) for p in md_files}
-        paths = list(bodies.keys())
-        N = len(paths)
-        visited = set()
-        for i in range(N):
-            if paths[i] in visited:
-                continue
-            a = bodies[paths[i]]
-            if len(a) < MIN_LEN:
-                continue
-            group = [paths[i]]
-            visited.add(paths[i])
-            for j in range(i+1, N):
-                if paths[j] in visited:
-                    continue
-                b = bodies[paths[j]]
-                if len(b) < MIN_LEN:
-                    continue
-                ratio = SequenceMatcher(None, a, b).ratio()
-                if ratio >= THRESHOLD:
-                    group.append(paths[j])
-                    visited.add(paths[j])
-            if len(group) > 1:
-                clusters.append([Path(p) for p in group])
+    bodies = load_bodies(ROOT / 'content')
+    clusters = [[Path(p) for p in group] for group in find_clusters(bodies)]
 
     modified = []
     for cluster in clusters:
@@ -2,74 +2,145 @@
 """
 Скрипт для анализа динамики роста репозитория.
 Собирает метрики по дням: количество файлов, строк и символов в .md документах.
+
+Серия считается инкрементально: первый день — полным подсчётом снимка,
+каждый следующий — по `git diff-tree` от коммита предыдущего дня.
+Коммит конца дня — последний коммит дня (по дате автора, как в `git log
+--date=short`) на first-parent линии HEAD; все дни находятся одним проходом
+`git rev-list`.
+Последний обработанный коммит сохраняется в artifacts/repo_growth_metrics.json,
+и при следующем запуске история читается только после него.
+
+Использование:
+    python3 .ops/repo_growth_metrics.py          # дописать новые дни
+    python3 .ops/repo_growth_metrics.py --full   # пересчитать всю историю
 """
 
 import subprocess
 import os
+import argparse
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
 
+from git_objects import GitObjectReader, BlobMetricsCache, count_snapshot_metrics, diff_tree_blobs
+
 def run_git_command(cmd):
     """Выполнить git команду и вернуть результат."""
     result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
     return result.stdout.strip()
 
-def get_commit_dates():
-    """Получить список уникальных дат с коммитами."""
-    output = run_git_command("git log --format='%ad' --date=short")
-    dates = sorted(set(output.split('\n')))
-    return [d for d in dates if d]
-
-def get_last_commit_of_day(date):
-    """Получить последний коммит за указанную дату."""
-    cmd = f"git log --format='%H' --date=short --until='{date} 23:59:59' -1"
-    return run_git_command(cmd)
-
-def count_metrics_at_commit(commit_hash):
-    """Подсчитать метрики для .md файлов в конкретном коммите."""
-    # Получаем список .md файлов
-    cmd = f"git ls-tree -r --name-only {commit_hash} | grep '\\.md$'"
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    md_files = [f for f in result.stdout.strip().split('\n') if f]
-
-    total_files = len(md_files)
-    total_lines = 0
-    total_chars = 0
-
-    # Подсчитываем строки и символы для каждого файла
-    for file_path in md_files:
-        cmd = f"git show {commit_hash}:{file_path} 2>/dev/null"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            content = result.stdout
-            total_lines += len(content.split('\n'))
-            total_chars += len(content)
+def get_day_commits(since_commit=None):
+    """Список (дата, коммит конца дня) по first-parent линии HEAD.
+
+    Один вызов git rev-list вместо git log на каждый день. Коммиты идут от
+    старых к новым, и коммит дня — последний встреченный. Даты по истории
+    растут не всегда (rebase, коммит со старой датой), поэтому дата коммита
+    не может быть раньше даты его предка: серия упорядочена по датам, а её
+    последний день — HEAD. С since_commit читаются только коммиты после него.
+    """
+    revisions = f"{since_commit}..HEAD" if since_commit else "HEAD"
+    # Дата автора в его часовом поясе: серия не зависит от пояса машины (CI в UTC)
+    output = run_git_command(f"git rev-list --first-parent --reverse --format=%ad --date=short {revisions}")
+
+    day_commits = {}
+    commit = None
+    date = None
+    for line in output.split('\n'):
+        if line.startswith('commit '):
+            commit = line.split()[1]
+        elif line and commit:
+            date = max(line, date) if date else line
+            day_commits[date] = commit
+            commit = None
+    return sorted(day_commits.items())
+
+def is_ancestor_of_head(commit):
+    """Входит ли коммит в историю HEAD."""
+    result = subprocess.run(f"git merge-base --is-ancestor {commit} HEAD",
+                            shell=True, capture_output=True)
+    return result.returncode == 0
+
+def count_metrics_at_commit(commit_hash, reader, cache):
+    """Подсчитать метрики для .md файлов в конкретном коммите.
+
+    Строки и символы каждого блоба берутся из кэша по SHA,
+    поэтому неизменившиеся файлы не перечитываются.
+    """
+    return count_snapshot_metrics(commit_hash, reader, cache, suffix='.md')
+
+def apply_tree_diff(totals, old_commit, new_commit, reader, cache):
+    """Обновить метрики снимка old_commit до new_commit по изменённым .md файлам."""
+    files, lines, chars = totals['files'], totals['lines'], totals['chars']
+
+    for old_sha, new_sha, _ in diff_tree_blobs(old_commit, new_commit, suffix='.md'):
+        if old_sha:
+            old_lines, old_chars = cache.get(old_sha, reader)
+            files -= 1
+            lines -= old_lines
+            chars -= old_chars
+        if new_sha:
+            new_lines, new_chars = cache.get(new_sha, reader)
+            files += 1
+            lines += new_lines
+            chars += new_chars
 
     return {
-        'files': total_files,
-        'lines': total_lines,
-        'chars': total_chars
+        'files': files,
+        'lines': lines,
+        'chars': chars
     }
 
-def collect_metrics():
-    """Собрать метрики по всем дням с коммитами."""
-    dates = get_commit_dates()
-    metrics = []
-
-    print(f"Найдено {len(dates)} дней с коммитами")
+def can_resume(previous):
+    """Можно ли продолжить сохранённую серию.
+
+    Последний коммит серии должен остаться в истории HEAD: после
+    переписанной истории (rebase, force-push) серия пересчитывается.
+    Файл без last_commit (старый формат) не используется.
+    """
+    if not previous or not previous.get('last_commit') or not previous.get('metrics'):
+        return False
+    last_commit = previous['last_commit']
+    return (last_commit.startswith(previous['metrics'][-1]['commit'])
+            and is_ancestor_of_head(last_commit))
+
+def collect_metrics(previous=None):
+    """Собрать метрики по всем дням с коммитами (продолжая сохранённую серию previous)."""
+    if can_resume(previous):
+        metrics = list(previous['metrics'])
+        base_commit = previous['last_commit']
+        totals = {k: metrics[-1][k] for k in ('files', 'lines', 'chars')}
+    else:
+        metrics, base_commit, totals = [], None, None
+    day_commits = get_day_commits(since_commit=base_commit)
+
+    print(f"Сохранено дней: {len(metrics)}, новых или дополненных: {len(day_commits)}")
     print("-" * 60)
 
-    for date in dates:
-        commit = get_last_commit_of_day(date)
-        if commit:
-            data = count_metrics_at_commit(commit)
-            data['date'] = date
-            data['commit'] = commit[:7]
-            metrics.append(data)
-            print(f"{date}: {data['files']} файлов, {data['lines']:,} строк, {data['chars']:,} символов")
+    cache = BlobMetricsCache()
+
+    with GitObjectReader() as reader:
+        for date, commit in day_commits:
+            if base_commit is None:
+                totals = count_metrics_at_commit(commit, reader, cache)
+            else:
+                totals = apply_tree_diff(totals, base_commit, commit, reader, cache)
+            base_commit = commit
 
-    return metrics
+            data = dict(totals)
+            data['date'] = max(date, metrics[-1]['date']) if metrics else date
+            data['commit'] = commit[:7]
+            if metrics and metrics[-1]['date'] == data['date']:
+                # Коммиты в последний сохранённый день (или с более ранней датой)
+                # обновляют его: серия остаётся упорядоченной по датам
+                metrics[-1] = data
+            else:
+                metrics.append(data)
+            print(f"{data['date']}: {data['files']} файлов, {data['lines']:,} строк, {data['chars']:,} символов")
+    cache.save()
+
+    print(f"Блобов из кэша: {cache.hits}, прочитано из git: {cache.misses}")
+    return metrics, base_commit
 
 def print_summary(metrics):
     """Вывести сводку по росту."""
@@ -128,14 +199,27 @@ def print_daily_chart(metrics, metric='files', width=50):
         bar = '█' * bar_len
         print(f"{m['date'][5:]}: {bar} {val:,}")
 
-def save_to_json(metrics, filename='repo_growth_metrics.json'):
+def get_metrics_path(filename='repo_growth_metrics.json'):
+    """Путь к файлу метрик в artifacts/."""
+    return os.path.join(os.path.dirname(__file__), '..', 'artifacts', filename)
+
+def load_from_json(filename='repo_growth_metrics.json'):
+    """Загрузить ранее сохранённые метрики (None, если файла нет или он повреждён)."""
+    try:
+        with open(get_metrics_path(filename), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_to_json(metrics, last_commit=None, filename='repo_growth_metrics.json'):
     """Сохранить метрики в JSON файл."""
-    output_path = os.path.join(os.path.dirname(__file__), '..', 'artifacts', filename)
+    output_path = get_metrics_path(filename)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump({
             'generated_at': datetime.now().isoformat(),
+            'last_commit': last_commit,
             'metrics': metrics
         }, f, ensure_ascii=False, indent=2)
 
@@ -144,11 +228,20 @@ def save_to_json(metrics, filename='repo_growth_metrics.json'):
 
 def main():
     """Основная функция."""
+    parser = argparse.ArgumentParser(description="Анализ динамики роста репозитория")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Пересчитать всю историю, не используя сохранённые метрики"
+    )
+    args = parser.parse_args()
+
     print("Анализ динамики роста репозитория")
     print("=" * 60)
 
-    # Собираем метрики
-    metrics = collect_metrics()
+    # Собираем метрики (продолжая сохранённую серию)
+    previous = None if args.full else load_from_json()
+    metrics, last_commit = collect_metrics(previous)
 
     # Выводим сводку
     print_summary(metrics)
@@ -159,7 +252,7 @@ def main():
     print_daily_chart(metrics, 'chars')
 
     # Сохраняем данные
-    save_to_json(metrics)
+    save_to_json(metrics, last_commit)
 
 if __name__ == '__main__':
     main()
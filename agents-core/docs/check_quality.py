@@ -16,44 +16,136 @@ Docs Agent: Check Quality
 
     # Проверка с fail при низком качестве (для CI)
     python3 agents-core/docs/check_quality.py --fail-below 60
+
+    # Параллельная проверка в 4 процессах (0 — по числу ядер)
+    python3 agents-core/docs/check_quality.py --jobs 4
+
+    # Перепроверить только изменения с origin/main (остальное — из кэша)
+    python3 agents-core/docs/check_quality.py --changed-since origin/main
+
+    # Результаты для дашбордов и Critique: JSONL по документам + JSON-сводка
+    python3 agents-core/docs/check_quality.py --jsonl results.jsonl --summary-json summary.json
+
+Результаты проверок кэшируются в agents-core/docs/.cache/quality_results.json
+(отключается через --no-cache).
 """
 
 import argparse
+import hashlib
+import heapq
+import json
+import os
 import re
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
 
 # Базовая директория проекта
 BASE_DIR = Path(__file__).parent.parent.parent
 CONTENT_DIR = BASE_DIR / "content"
 ARTIFACTS_DIR = BASE_DIR / "artifacts" / "docs" / "reviews"
+RESULTS_CACHE_FILE = Path(__file__).parent / ".cache" / "quality_results.json"
+# Увеличивать при изменении правил проверки или формата результата
+RESULTS_CACHE_VERSION = 1
 
 # Создаем директорию для отчетов если не существует
 ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def check_frontmatter(file_path: Path) -> Dict:
-    """Проверяет наличие и корректность frontmatter"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+@dataclass
+class ParsedDocument:
+    """
+    Документ, прочитанный и разобранный один раз для всех проверок
+
+    - content: полный текст файла
+    - frontmatter: текст frontmatter (None, если его нет или формат некорректен)
+    - body: текст после frontmatter
+    - lines: строки полного текста
+    - headings: заголовки (уровень, номер строки, текст)
+    - links: цели wiki-ссылок `[[...]]`
+    - code_spans: позиции блоков кода ```...``` в content
+    """
+    path: Path
+    content: str
+    frontmatter: Optional[str]
+    body: str
+    lines: List[str] = field(default_factory=list)
+    headings: List[Tuple[int, int, str]] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    code_spans: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def has_frontmatter(self) -> bool:
+        return self.content.startswith('---')
+
+
+def parse_document(file_path: Path, content: Optional[str] = None) -> ParsedDocument:
+    """
+    Читает файл и выполняет общий разбор (один раз на документ)
+
+    content — уже прочитанный текст файла (например, при сверке с кэшем
+    результатов), тогда файл повторно не читается.
+    """
+    if content is None:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
 
+    frontmatter = None
+    body = content
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            frontmatter, body = parts[1], parts[2]
+
+    lines = content.split('\n')
+
+    # Заголовок уровня N: строка начинается с N символов '#' и пробела, за которым не '#'
+    headings = []
+    for i, line in enumerate(lines):
+        if not line.startswith('#'):
+            continue
+        level = len(line) - len(line.lstrip('#'))
+        if line[level:level + 1] == ' ' and line[level + 1:level + 2] != '#':
+            headings.append((level, i, line[level + 1:].strip()))
+
+    return ParsedDocument(
+        path=file_path,
+        content=content,
+        frontmatter=frontmatter,
+        body=body,
+        lines=lines,
+        headings=headings,
+        links=re.findall(r'\[\[([^\]]+)\]\]', content),
+        code_spans=[m.span() for m in re.finditer(r'```.*?```', content, flags=re.DOTALL)],
+    )
+
+
+def check_frontmatter(doc: ParsedDocument) -> Dict:
+    """Проверяет наличие и корректность frontmatter"""
     issues = []
     score = 100
 
     # Проверка наличия frontmatter
-    if not content.startswith('---'):
+    if not doc.has_frontmatter:
         issues.append("Отсутствует frontmatter")
         return {"score": 0, "issues": issues}
 
     # Извлекаем frontmatter
-    parts = content.split('---', 2)
-    if len(parts) < 3:
+    if doc.frontmatter is None:
         issues.append("Некорректный формат frontmatter")
         return {"score": 0, "issues": issues}
 
-    frontmatter = parts[1]
+    frontmatter = doc.frontmatter
 
     # Обязательные поля
     required_fields = ["type", "audience", "edit_mode", "layer", "scope", "security"]
@@ -72,34 +164,101 @@ def check_frontmatter(file_path: Path) -> Dict:
     return {"score": max(0, score), "issues": issues}
 
 
-def check_links(file_path: Path, content_dir: Path) -> Dict:
+def _normalize_link_target(target: str) -> str:
+    """Нормализует цель ссылки/путь для поиска в индексе"""
+    target = re.sub(r'^(\.\.?/)+', '', target.strip().replace('\\', '/')).strip('/')
+    if target.lower().endswith('.md'):
+        target = target[:-3]
+    return target.lower()
+
+
+def _frontmatter_aliases(content: str) -> List[str]:
+    """Извлекает aliases из frontmatter документа"""
+    if not content.startswith('---'):
+        return []
+    parts = content.split('---', 2)
+    if len(parts) < 3 or 'aliases:' not in parts[1]:
+        return []
+
+    if HAS_YAML:
+        try:
+            data = yaml.safe_load(parts[1]) or {}
+        except yaml.YAMLError:
+            return []
+        aliases = data.get('aliases') if isinstance(data, dict) else None
+        if isinstance(aliases, str):
+            return [aliases]
+        return [str(a) for a in aliases or []]
+
+    # Без PyYAML: `aliases: [a, b]`, `aliases: a` и блочный список `- a`
+    match = re.search(r'^aliases:[ \t]*(.*)$((?:\n[ \t]*-[ \t]*.*$)*)', parts[1], flags=re.MULTILINE)
+    if not match:
+        return []
+    inline, block = match.group(1).strip(), match.group(2)
+    if inline.startswith('['):
+        items = inline.strip('[]').split(',')
+    elif inline:
+        items = [inline]
+    else:
+        items = re.findall(r'^[ \t]*-[ \t]*(.*)$', block, flags=re.MULTILINE)
+    return [item.strip().strip('"\'') for item in items if item.strip()]
+
+
+def build_link_index(content_dir: Path) -> Set[str]:
+    """
+    Строит индекс целей wiki-ссылок (один раз на запуск)
+
+    В индекс попадают (в нижнем регистре, .md без расширения):
+    - имена файлов и папок и все суффиксы относительного пути
+      (`Имя`, `Папка/Имя`, `content/Папка/Имя`)
+    - aliases из frontmatter документов
+    """
+    index: Set[str] = set()
+    root = content_dir.parent
+
+    for file in content_dir.rglob("*"):
+        rel_parts = file.relative_to(root).parts
+        for i in range(len(rel_parts)):
+            index.add(_normalize_link_target('/'.join(rel_parts[i:])))
+
+        if file.suffix == '.md' and file.is_file():
+            try:
+                content = file.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            for alias in _frontmatter_aliases(content):
+                index.add(_normalize_link_target(alias))
+
+    return index
+
+
+def resolve_link(link: str, link_index: Set[str]) -> bool:
+    """Проверяет, что wiki-ссылка `[[цель#раздел|текст]]` указывает на существующий документ"""
+    # Убираем отображаемый текст (|...) и секции (#...)
+    target = link.split('|')[0].split('#')[0].strip()
+    if not target:
+        return True  # ссылка на раздел текущего документа
+    return _normalize_link_target(target) in link_index
+
+
+def check_links(doc: ParsedDocument, content_dir: Path, link_index: Optional[Set[str]] = None) -> Dict:
     """Проверяет валидность wiki-ссылок"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    if link_index is None:
+        link_index = build_link_index(content_dir)
 
     issues = []
     score = 100
 
-    # Находим все wiki-ссылки
-    wiki_links = re.findall(r'\[\[([^\]]+)\]\]', content)
+    # Все wiki-ссылки документа
+    wiki_links = doc.links
 
     if not wiki_links:
-        return {"score": 100, "issues": [], "total": 0, "broken": 0}
+        return {"score": 100, "issues": [], "total": 0, "broken": 0, "targets": []}
 
     broken_links = []
 
     for link in wiki_links:
-        # Убираем секции (#...)
-        link_file = link.split('#')[0].strip()
-
-        # Ищем файл в content/
-        found = False
-        for file in content_dir.rglob("*.md"):
-            if link_file in file.stem or link_file in str(file):
-                found = True
-                break
-
-        if not found:
+        if not resolve_link(link, link_index):
             broken_links.append(link)
 
     if broken_links:
@@ -114,21 +273,32 @@ def check_links(file_path: Path, content_dir: Path) -> Dict:
         "score": score,
         "issues": issues,
         "total": len(wiki_links),
-        "broken": len(broken_links)
+        "broken": len(broken_links),
+        "targets": wiki_links
     }
 
 
-def calculate_readability(text: str) -> int:
+def calculate_readability(text: str, code_spans: Optional[List[Tuple[int, int]]] = None) -> int:
     """
     Упрощенный расчет читаемости (Flesch Reading Ease)
 
     90-100: Very Easy (5th grade)
     60-70: Standard (8th-9th grade) ← целевое значение
     0-30: Very Difficult (college graduate)
+
+    code_spans — уже найденные блоки кода (из parse_document), чтобы не искать их повторно.
     """
 
     # Удаляем код блоки и frontmatter
-    text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
+    if code_spans is None:
+        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
+    else:
+        pieces, pos = [], 0
+        for start, end in code_spans:
+            pieces.append(text[pos:start])
+            pos = end
+        pieces.append(text[pos:])
+        text = ''.join(pieces)
     text = re.sub(r'---.*?---', '', text, flags=re.DOTALL)
 
     # Удаляем markdown разметку
@@ -162,16 +332,13 @@ def calculate_readability(text: str) -> int:
     return int(score)
 
 
-def check_document_structure(file_path: Path) -> Dict:
+def check_document_structure(doc: ParsedDocument) -> Dict:
     """Проверяет структуру документа (заголовки, разделы)"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
     issues = []
     score = 100
 
     # Проверяем наличие H1 (должен быть один)
-    h1_count = len(re.findall(r'^# [^#]', content, flags=re.MULTILINE))
+    h1_count = sum(1 for level, _, _ in doc.headings if level == 1)
     if h1_count == 0:
         issues.append("Отсутствует заголовок первого уровня (H1)")
         score -= 20
@@ -180,23 +347,19 @@ def check_document_structure(file_path: Path) -> Dict:
         score -= 10
 
     # Проверяем наличие H2 (основные разделы)
-    h2_count = len(re.findall(r'^## [^#]', content, flags=re.MULTILINE))
+    h2_count = sum(1 for level, _, _ in doc.headings if level == 2)
     if h2_count == 0:
         issues.append("Отсутствуют разделы (H2)")
         score -= 15
 
     # Проверяем порядок заголовков (не должно быть H4 без H3)
-    if '####' in content and '###' not in content:
+    if '####' in doc.content and '###' not in doc.content:
         issues.append("Некорректная иерархия заголовков (H4 без H3)")
         score -= 10
 
     # Проверяем наличие краткого описания (первый абзац после H1)
-    lines = content.split('\n')
-    h1_index = None
-    for i, line in enumerate(lines):
-        if line.startswith('# ') and not line.startswith('## '):
-            h1_index = i
-            break
+    lines = doc.lines
+    h1_index = next((i for level, i, _ in doc.headings if level == 1), None)
 
     if h1_index is not None:
         # Ищем первый непустой абзац после H1
@@ -214,21 +377,21 @@ def check_document_structure(file_path: Path) -> Dict:
     return {"score": max(0, score), "issues": issues}
 
 
-def check_document(file_path: Path, content_dir: Path) -> Dict:
-    """Комплексная проверка документа"""
+def check_document(file_path: Path, content_dir: Path, link_index: Optional[Set[str]] = None,
+                   content: Optional[str] = None) -> Dict:
+    """Комплексная проверка документа (content — уже прочитанный текст, если есть)"""
 
     # Resolve абсолютный путь
     file_path = file_path.resolve()
 
-    # Читаем содержимое для расчета читаемости
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Файл читается и разбирается один раз, все проверки используют результат
+    doc = parse_document(file_path, content)
 
     # Проверки
-    frontmatter_check = check_frontmatter(file_path)
-    links_check = check_links(file_path, content_dir)
-    structure_check = check_document_structure(file_path)
-    readability_score = calculate_readability(content)
+    frontmatter_check = check_frontmatter(doc)
+    links_check = check_links(doc, content_dir, link_index)
+    structure_check = check_document_structure(doc)
+    readability_score = calculate_readability(doc.content, doc.code_spans)
 
     # Общий score (средневзвешенный)
     total_score = int(
@@ -251,6 +414,7 @@ def check_document(file_path: Path, content_dir: Path) -> Dict:
 
     return {
         "file": file_path,
+        "content_hash": content_hash(doc.content),
         "score": total_score,
         "grade": grade,
         "status": status,
@@ -263,16 +427,310 @@ def check_document(file_path: Path, content_dir: Path) -> Dict:
     }
 
 
-def generate_report(results: List[Dict], output_path: Path = None) -> str:
+# Контекст процесса-исполнителя: (content_dir, link_index), задается один раз при старте
+_WORKER_CONTEXT: Optional[Tuple[Path, Set[str]]] = None
+
+
+def _init_worker(content_dir: Path, link_index: Set[str]) -> None:
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = (content_dir, link_index)
+
+
+def _check_document_worker(file_path: Path, content: Optional[str] = None) -> Dict:
+    content_dir, link_index = _WORKER_CONTEXT
+    return check_document(file_path, content_dir, link_index, content)
+
+
+def iter_check_results(files: List[Path], content_dir: Path, link_index: Set[str], jobs: int = 1,
+                       contents: Optional[List[Optional[str]]] = None
+                       ) -> Iterator[Tuple[int, Optional[Dict], Optional[Exception]]]:
+    """
+    Проверяет документы и отдает результаты по мере готовности
+
+    Возвращает тройки (индекс файла в files, результат, ошибка). При jobs > 1
+    проверки выполняются в пуле процессов; индекс ссылок передается каждому
+    процессу один раз при старте, а не с каждым документом. contents —
+    уже прочитанные тексты файлов (None для непрочитанных).
+    """
+    if contents is None:
+        contents = [None] * len(files)
+
+    if jobs <= 1:
+        for i, file_path in enumerate(files):
+            try:
+                yield i, check_document(file_path, content_dir, link_index, contents[i]), None
+            except Exception as e:
+                yield i, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(content_dir, link_index)) as pool:
+        futures = {pool.submit(_check_document_worker, file_path, contents[i]): i
+                   for i, file_path in enumerate(files)}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def content_hash(content: str) -> str:
+    """SHA-1 текста документа (ключ кэша результатов)"""
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def links_state(targets: List[str], link_index: Set[str]) -> str:
+    """
+    Отпечаток разрешения ссылок документа в текущем индексе
+
+    Меняется, когда цель ссылки исчезает (удаление, переименование) или
+    появляется, — то есть ровно тогда, когда меняется результат check_links.
+    """
+    state = "\n".join(f"{int(resolve_link(link, link_index))}{link}" for link in targets)
+    return hashlib.sha1(state.encode("utf-8")).hexdigest()
+
+
+def file_stat(file_path: Path) -> Optional[List[int]]:
+    """[mtime_ns, размер] файла или None, если файл недоступен"""
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ResultsCache:
+    """
+    Постоянный кэш результатов check_document
+
+    Запись валидна, пока совпадают хэш текста документа и отпечаток
+    разрешения его ссылок в индексе целей (links_state): переименование или
+    удаление заметки инвалидирует только документы, которые на нее ссылаются.
+    С записью хранятся mtime и размер файла (stat): по ним без чтения файла
+    видно, что он не менялся с момента проверки.
+    """
+
+    def __init__(self, path: Path = RESULTS_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.seen: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Кэш результатов поврежден, будет пересоздан: {e}")
+            return
+        if data.get("version") == RESULTS_CACHE_VERSION:
+            self.entries = data.get("results", {})
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return file_path.resolve().relative_to(BASE_DIR.resolve()).as_posix()
+
+    def unchanged_on_disk(self, file_path: Path) -> bool:
+        """Совпадают ли mtime и размер файла с сохраненными в записи"""
+        entry = self.entries.get(self._key(file_path))
+        return entry is not None and entry.get("stat") is not None and entry["stat"] == file_stat(file_path)
+
+    def get(self, file_path: Path, link_index: Set[str], content: Optional[str] = None) -> Optional[Dict]:
+        """
+        Сохраненный результат или None
+
+        Если content не передан, файл должен быть проверен unchanged_on_disk
+        (режим --changed-since): сверяется только разрешение его ссылок.
+        """
+        key = self._key(file_path)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if (entry is None
+                or (content is not None and entry["content_hash"] != content_hash(content))
+                or entry["links_state"] != links_state(entry["checks"]["links"]["targets"], link_index)):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if content is not None:
+            # Текст тот же (например, после checkout): следующий запуск обойдется без чтения
+            entry["stat"] = file_stat(file_path)
+        result = {k: v for k, v in entry.items() if k not in ("links_state", "stat")}
+        result["file"] = BASE_DIR.resolve() / key
+        return result
+
+    def put(self, result: Dict, link_index: Set[str]):
+        key = self._key(result["file"])
+        self.seen.add(key)
+        entry = {k: v for k, v in result.items() if k != "file"}
+        entry["links_state"] = links_state(result["checks"]["links"]["targets"], link_index)
+        entry["stat"] = file_stat(result["file"])
+        self.entries[key] = entry
+
+    def save(self):
+        # Записи удаленных файлов не сохраняются
+        root = BASE_DIR.resolve()
+        self.entries = {k: v for k, v in self.entries.items() if k in self.seen or (root / k).exists()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": RESULTS_CACHE_VERSION, "results": self.entries},
+                       ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.path)
+
+
+def git_changed_files(ref: str) -> Set[Path]:
+    """
+    Файлы, измененные с ref: коммиты после ref, незакоммиченные правки
+    и новые неотслеживаемые файлы (абсолютные пути)
+    """
+    commands = [
+        ["git", "diff", "--name-only", "-z", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+    ]
+    root = BASE_DIR.resolve()
+    changed = set()
+    for cmd in commands:
+        result = subprocess.run(cmd, cwd=root, capture_output=True, check=True)
+        for name in result.stdout.decode("utf-8", errors="replace").split("\0"):
+            if name:
+                changed.add(root / name)
+    return changed
+
+
+def relative_path(file_path: Path) -> str:
+    """Путь документа относительно корня репозитория (для отчетов и JSON)"""
+    try:
+        return file_path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return file_path.resolve().relative_to(BASE_DIR.resolve()).as_posix()
+
+
+def result_record(result: Dict) -> Dict:
+    """Результат check_document в JSON-совместимом виде (путь — строкой)"""
+    record = {"file": relative_path(result["file"])}
+    record.update((key, value) for key, value in result.items() if key != "file")
+    return record
+
+
+class QualitySummary:
+    """
+    Сводная статистика, накапливаемая по одному результату за раз
+
+    Хранит только счетчики и WORST_LIMIT худших документов, поэтому память
+    не зависит от размера vault.
+    """
+
+    WORST_LIMIT = 5
+    CHECKS = ("frontmatter", "links", "structure")
+
+    def __init__(self):
+        self.total = 0
+        self.by_status = {"excellent": 0, "good": 0, "needs_improvement": 0}
+        self.score_sum = 0
+        self.readability_sum = 0
+        self.check_score_sums = {name: 0 for name in self.CHECKS}
+        self.links_total = 0
+        self.links_broken = 0
+        self.issues_total = 0
+        # Куча (-score, -order, record): на вершине — лучший из худших
+        self._worst: List[Tuple[int, int, Dict]] = []
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict]) -> "QualitySummary":
+        summary = cls()
+        for order, result in enumerate(results):
+            summary.add(result, order)
+        return summary
+
+    def add(self, result: Dict, order: int):
+        """Учитывает результат; order — позиция файла (для стабильного порядка худших)"""
+        self.total += 1
+        self.by_status[result["status"]] += 1
+        self.score_sum += result["score"]
+        self.readability_sum += result["readability"]
+        for name in self.CHECKS:
+            check = result["checks"][name]
+            self.check_score_sums[name] += check["score"]
+            self.issues_total += len(check["issues"])
+        self.links_total += result["checks"]["links"]["total"]
+        self.links_broken += result["checks"]["links"]["broken"]
+
+        if result["status"] == "needs_improvement":
+            issues = [issue for name in self.CHECKS for issue in result["checks"][name]["issues"]]
+            entry = (-result["score"], -order,
+                     {"file": relative_path(result["file"]), "score": result["score"], "issues": issues})
+            if len(self._worst) < self.WORST_LIMIT:
+                heapq.heappush(self._worst, entry)
+            elif entry > self._worst[0]:
+                heapq.heapreplace(self._worst, entry)
+
+    @property
+    def avg_score(self) -> float:
+        return self.score_sum / self.total if self.total else 0
+
+    def percent(self, status: str) -> float:
+        return self.by_status[status] / self.total * 100 if self.total else 0
+
+    def worst(self) -> List[Dict]:
+        """Худшие документы: по возрастанию score, при равенстве — в порядке файлов"""
+        return [record for _, _, record in sorted(self._worst, reverse=True)]
+
+    def to_dict(self) -> Dict:
+        total = self.total or 1
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "total": self.total,
+            "avg_score": round(self.avg_score, 1),
+            "avg_readability": round(self.readability_sum / total, 1),
+            "by_status": dict(self.by_status),
+            "checks": {name: round(value / total, 1) for name, value in self.check_score_sums.items()},
+            "links": {"total": self.links_total, "broken": self.links_broken},
+            "issues": self.issues_total,
+            "worst": self.worst(),
+        }
+
+
+class JsonlWriter:
+    """Построчная запись результатов: каждая запись сбрасывается на диск сразу"""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.file: TextIO = open(path, "w", encoding="utf-8")
+
+    def write(self, result: Dict):
+        self.file.write(json.dumps(result_record(result), ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def generate_report(results: List[Dict], output_path: Path = None,
+                    summary: Optional[QualitySummary] = None) -> str:
     """Генерирует отчет о проверке качества"""
 
     # Статистика
-    total_docs = len(results)
-    excellent = sum(1 for r in results if r["status"] == "excellent")
-    good = sum(1 for r in results if r["status"] == "good")
-    needs_improvement = sum(1 for r in results if r["status"] == "needs_improvement")
+    if summary is None:
+        summary = QualitySummary.from_results(results)
+    total_docs = summary.total
+    excellent = summary.by_status["excellent"]
+    good = summary.by_status["good"]
+    needs_improvement = summary.by_status["needs_improvement"]
 
-    avg_score = sum(r["score"] for r in results) / total_docs if total_docs > 0 else 0
+    avg_score = summary.avg_score
 
     # Формируем отчет
     report = f"""# Отчет о качестве документации
@@ -378,7 +836,44 @@ def main():
         help="Показать полный отчет в консоли"
     )
 
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Число процессов для проверки (0 — по числу ядер, по умолчанию: 1)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать и не обновлять кэш результатов"
+    )
+
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Проверять только файлы, измененные с git-ref, и документы со ссылками "
+             "на переименованные/удаленные заметки; остальные результаты берутся из кэша"
+    )
+
+    parser.add_argument(
+        "--jsonl",
+        type=Path,
+        help="Писать результаты по документам в JSONL (по мере готовности)"
+    )
+
+    parser.add_argument(
+        "--summary-json",
+        type=Path,
+        help="Сохранить сводную статистику в JSON"
+    )
+
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if args.changed_since and args.no_cache:
+        print("❌ --changed-since требует кэш результатов (несовместим с --no-cache)")
+        sys.exit(2)
 
     print("🔍 Проверка качества документации...\n")
 
@@ -386,7 +881,7 @@ def main():
     if args.path.is_file():
         files = [args.path]
     else:
-        files = list(args.path.rglob("*.md"))
+        files = sorted(args.path.rglob("*.md"))
         # Исключаем артефакты и служебные файлы
         files = [f for f in files if "artifacts" not in str(f) and ".obsidian" not in str(f)]
 
@@ -396,14 +891,78 @@ def main():
 
     print(f"📄 Найдено документов: {len(files)}\n")
 
-    # Проверяем каждый документ
-    results = []
-    for file_path in files:
+    # Индекс целей ссылок строится один раз для всех документов
+    link_index = build_link_index(CONTENT_DIR)
+
+    changed = None
+    if args.changed_since:
         try:
-            result = check_document(file_path, CONTENT_DIR)
-            results.append(result)
-        except Exception as e:
-            print(f"⚠️  Ошибка при проверке {file_path}: {e}")
+            changed = git_changed_files(args.changed_since)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ Не удалось получить изменения с {args.changed_since}: {e}")
+            sys.exit(2)
+
+    # Результаты из кэша: в режиме --changed-since файлы вне диффа не читаются,
+    # если их mtime и размер совпадают с записью (кэш мог быть заполнен на
+    # другом коммите); иначе запись сверяется с хэшем текста. В обоих случаях
+    # сверяется разрешение ссылок, так что документы со ссылками на
+    # переименованные или удаленные заметки проверяются заново.
+    cache = None if args.no_cache else ResultsCache()
+    summary = QualitySummary()
+    jsonl = JsonlWriter(args.jsonl) if args.jsonl else None
+    # Полные результаты нужны только для Markdown-отчета; сводка и JSONL
+    # обрабатывают их по одному, так что без --full-report память не растет
+    results_by_index = {} if args.full_report else None
+
+    def accept(i: int, result: Dict):
+        summary.add(result, i)
+        if jsonl is not None:
+            jsonl.write(result)
+        if results_by_index is not None:
+            results_by_index[i] = result
+
+    to_check = []
+    # Тексты, прочитанные для сверки с кэшем: при промахе проверка их не перечитывает
+    contents: Dict[int, str] = {}
+    for i, file_path in enumerate(files):
+        cached = None
+        if cache is not None:
+            if (changed is not None and file_path.resolve() not in changed
+                    and cache.unchanged_on_disk(file_path)):
+                cached = cache.get(file_path, link_index)
+            else:
+                try:
+                    content = file_path.read_text(encoding="utf-8")
+                except (OSError, UnicodeDecodeError):
+                    content = None
+                if content is not None:
+                    cached = cache.get(file_path, link_index, content)
+                    if cached is None:
+                        contents[i] = content
+        if cached is not None:
+            accept(i, cached)
+        else:
+            to_check.append(i)
+
+    if cache is not None:
+        print(f"♻️  Из кэша: {cache.hits}, к проверке: {len(to_check)}\n")
+
+    # Проверяем документы; порядок в Markdown-отчете и сводке — порядок файлов,
+    # независимо от того, в каком порядке завершились проверки
+    check_files = [files[i] for i in to_check]
+    check_contents = [contents.pop(i, None) for i in to_check]
+    for j, result, error in iter_check_results(check_files, CONTENT_DIR, link_index, jobs, check_contents):
+        if error is not None:
+            print(f"⚠️  Ошибка при проверке {check_files[j]}: {error}")
+        else:
+            accept(to_check[j], result)
+            if cache is not None:
+                cache.put(result, link_index)
+
+    if jsonl is not None:
+        jsonl.close()
+    if cache is not None:
+        cache.save()
 
     # Генерируем отчет
     if args.output:
@@ -411,39 +970,38 @@ def main():
     else:
         output_path = ARTIFACTS_DIR / f"quality-report-{datetime.now().strftime('%Y-%m-%d')}.md"
 
-    report = generate_report(results, output_path if args.full_report else None)
+    if results_by_index is not None:
+        results = [results_by_index[i] for i in sorted(results_by_index)]
+        generate_report(results, output_path, summary)
+
+    if args.summary_json:
+        args.summary_json.parent.mkdir(parents=True, exist_ok=True)
+        args.summary_json.write_text(
+            json.dumps(summary.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
 
     # Выводим краткую сводку
-    total_docs = len(results)
-    excellent = sum(1 for r in results if r["status"] == "excellent")
-    good = sum(1 for r in results if r["status"] == "good")
-    needs_improvement = sum(1 for r in results if r["status"] == "needs_improvement")
-    avg_score = sum(r["score"] for r in results) / total_docs if total_docs > 0 else 0
+    total_docs = summary.total
+    needs_improvement = summary.by_status["needs_improvement"]
+    avg_score = summary.avg_score
 
     print("📊 Результаты:")
     print("━" * 50)
     print(f"Всего документов: {total_docs}")
-    print(f"✅ Отлично (≥80): {excellent} ({excellent/total_docs*100:.0f}%)")
-    print(f"🟡 Хорошо (60-79): {good} ({good/total_docs*100:.0f}%)")
-    print(f"🔴 Нужны улучшения (<60): {needs_improvement} ({needs_improvement/total_docs*100:.0f}%)")
+    print(f"✅ Отлично (≥80): {summary.by_status['excellent']} ({summary.percent('excellent'):.0f}%)")
+    print(f"🟡 Хорошо (60-79): {summary.by_status['good']} ({summary.percent('good'):.0f}%)")
+    print(f"🔴 Нужны улучшения (<60): {needs_improvement} ({summary.percent('needs_improvement'):.0f}%)")
     print()
 
     # Показываем проблемные документы
     if needs_improvement > 0:
         print("Проблемы:")
         print("━" * 50)
-        problem_docs = sorted([r for r in results if r["status"] == "needs_improvement"],
-                            key=lambda x: x["score"])
-        for result in problem_docs[:5]:  # Топ 5 самых проблемных
-            rel_path = result["file"].relative_to(BASE_DIR)
-            print(f"🔴 {rel_path}")
+        for record in summary.worst():  # Топ 5 самых проблемных
+            print(f"🔴 {record['file']}")
 
             # Показываем первые 2 проблемы
-            all_issues = (
-                result["checks"]["frontmatter"]["issues"] +
-                result["checks"]["links"]["issues"] +
-                result["checks"]["structure"]["issues"]
-            )
+            all_issues = record["issues"]
             for issue in all_issues[:2]:
                 print(f"   - {issue}")
 
@@ -451,6 +1009,10 @@ def main():
                 print(f"   - ... и еще {len(all_issues) - 2} проблем(а)")
             print()
 
+    if args.jsonl:
+        print(f"🧾 Результаты JSONL: {args.jsonl}")
+    if args.summary_json:
+        print(f"🧾 Сводка JSON: {args.summary_json}")
     if args.full_report or args.output:
         print(f"📝 Детальный отчет: {output_path}")
 
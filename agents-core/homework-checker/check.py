@@ -14,13 +14,26 @@ import yaml
 import os
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, List, Optional
+
+from context_store import DEFAULT_RELOAD_INTERVAL, ContextStore
+from guide_index import GuideIndex
+from llm_resilience import LLMUnavailable, ResilientClient
+from llm_stream import DEFAULT_DRAIN_CHARS, extract_json_object, read_message_stream
+from metrics import CACHE_LOOKUPS, LLM_TOKENS, observe_stage
+from prompt_template import (DEFAULT_CHARS_PER_TOKEN, DEFAULT_CONTEXT_WINDOW, DEFAULT_MAX_NORMATIVE_TOKENS,
+                             DEFAULT_SAFETY_MARGIN_TOKENS, compile_template, estimate_tokens,
+                             normative_block, truncate_to_tokens)
+from result_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL, ResultCache, cache_key
 
 
 # Корень агента
 AGENT_ROOT = Path(__file__).parent
 DEFAULT_CONFIG = AGENT_ROOT / "config.yaml"
 
+DEFAULT_LLM_BASE_URL = "https://api.anthropic.com"
+DEFAULT_LLM_TIMEOUT = 60.0
+
 
 def load_config(config_path: Path = DEFAULT_CONFIG) -> dict:
     """Загрузка конфигурации."""
@@ -55,22 +68,90 @@ def load_rubrics(config: dict) -> dict:
         return yaml.safe_load(f)
 
 
-def get_check_context(course_name: str, section_name: str, config: dict) -> dict:
+def create_guide_index(config: dict) -> Optional[GuideIndex]:
+    """Индекс разделов руководств или None, если каталога руководств нет."""
+    guides_root = AGENT_ROOT / config["paths"].get("guides_root", "")
+    if not config["paths"].get("guides_root") or not guides_root.is_dir():
+        print(f"[WARN] Каталог руководств не найден ({guides_root}), норматив не подставляется",
+              file=sys.stderr)
+        return None
+    index = GuideIndex(guides_root)
+    print(f"[INFO] Руководства: {index.stats['files']} файлов, {index.stats['sections']} разделов",
+          file=sys.stderr)
+    return index
+
+
+def create_context_store(config: dict) -> ContextStore:
+    """Предзагруженные рубрики, карта вопросов и индекс руководств (один раз на процесс)."""
+    return ContextStore(
+        rubrics_path=AGENT_ROOT / config["paths"]["rubrics"],
+        questions_map_path=AGENT_ROOT / config["paths"]["questions_map"],
+        format_rubric=format_rubric_for_prompt,
+        reload_interval=config.get("context", {}).get("reload_interval", DEFAULT_RELOAD_INTERVAL),
+        guides_factory=lambda: create_guide_index(config),
+    )
+
+
+def find_normative(course_name: str, section_name: str, question: Optional[dict],
+                   snapshot, guides: GuideIndex, config: dict):
+    """
+    Раздел руководства для (курс, раздел).
+
+    Раздел из карты вопросов ищется в своём файле (guide_root + guide_path)
+    по guide_section; иначе — нечётко по названию раздела среди руководств
+    курса, а для курса вне карты — среди всех руководств.
+    """
+    repo_root = AGENT_ROOT / config["paths"].get("repo_root", "../..")
+    if question and question.get("guide_root") and question.get("guide_path"):
+        section = guides.section(repo_root / question["guide_root"] / question["guide_path"],
+                                 question.get("guide_section") or section_name)
+        if section is not None:
+            return section
+
+    course_root = snapshot.course_root(course_name)
+    return guides.find(section_name, repo_root / course_root if course_root else None)
+
+
+def get_check_context(course_name: str, section_name: str, config: dict,
+                      store: Optional[ContextStore] = None) -> dict:
     """
     Получение контекста проверки из репозитория руководств.
 
-    v0.1: Заглушка — возвращает базовый контекст.
-    TODO: Интеграция с MCP-эндпоинтом /check-context репозитория руководств.
+    Рубрика выбирается по карте вопросов (rubric_id раздела), для разделов
+    вне карты — рубрика по умолчанию. store — предзагруженный контекст из
+    create_context_store; без него рубрики читаются с диска, а руководства
+    индексируются заново.
+
+    Норматив — текст раздела руководства (find_normative); если раздел не
+    найден, в промпт идёт пометка об отсутствии норматива.
     """
-    # Базовая рубрика для v0.1
-    rubrics = load_rubrics(config)
-    default_rubric = rubrics.get("rubrics", {}).get("rubric_conceptual_understanding", {})
+    one_off = store is None
+    if one_off:
+        store = create_context_store(config)
+    snapshot = store.snapshot()
+    guides = store.guides  # индекс может смениться перезагрузкой во время запроса
+
+    question = snapshot.find_section(course_name, section_name)
+    rubric, rubric_prompt = snapshot.rubric_for(question.get("rubric_id") if question else None)
+
+    normative_content = f"[Норматив для раздела '{section_name}' курса '{course_name}' не найден в руководствах]"
+    normative_source = None
+    if guides is not None:
+        section = find_normative(course_name, section_name, question, snapshot, guides, config)
+        if section is not None:
+            normative_content = guides.text(section)
+            normative_source = f"{os.path.relpath(section.file, guides.guides_root)}#{section.title}"
+    if one_off:
+        store.close()
 
     return {
         "course_name": course_name,
         "section_name": section_name,
-        "normative_content": f"[Норматив для раздела '{section_name}' курса '{course_name}' будет загружен из репозитория руководств]",
-        "rubric": default_rubric
+        "normative_content": normative_content,
+        "normative_source": normative_source,
+        "rubric": rubric,
+        "rubric_prompt": rubric_prompt,
+        "question": question
     }
 
 
@@ -96,16 +177,51 @@ def build_llm_request(
     prompts: dict,
     config: dict
 ) -> dict:
-    """Сборка запроса к LLM."""
+    """
+    Сборка запроса к LLM.
 
-    check_prompt = prompts.get("check_template", "")
+    Шаблон компилируется один раз (prompt_template.compile_template).
+    Норматив ограничивается бюджетом токенов: не больше
+    prompt.max_normative_tokens (результат кэшируется по курсу и разделу) и
+    не больше того, что остаётся от llm.context_window после ответа
+    (llm.max_tokens), системного промпта, шаблона, вопроса, ответа и рубрики.
+    """
+    prompt_config = config.get("prompt", {})
+    chars_per_token = prompt_config.get("chars_per_token", DEFAULT_CHARS_PER_TOKEN)
+    template = compile_template(prompts.get("check_template", ""))
+    system_prompt = prompts.get("system", "")
+
+    question_text = request["question_text"]
+    answer_text = request["answer_text"]
+    rubric_criteria = context.get("rubric_prompt") or format_rubric_for_prompt(context.get("rubric"))
+
+    normative = normative_block(
+        context.get("course_name", ""),
+        context.get("section_name", ""),
+        context.get("normative_content", ""),
+        prompt_config.get("max_normative_tokens", DEFAULT_MAX_NORMATIVE_TOKENS),
+        chars_per_token,
+    )
 
-    # Подставляем переменные
-    user_content = check_prompt.format(
-        question_text=request["question_text"],
-        answer_text=request["answer_text"],
-        normative_content=context.get("normative_content", "")[:8000],
-        rubric_criteria=format_rubric_for_prompt(context.get("rubric"))
+    # Что остаётся на норматив в окне контекста модели
+    available = (
+        config["llm"].get("context_window", DEFAULT_CONTEXT_WINDOW)
+        - config["llm"]["max_tokens"]
+        - prompt_config.get("safety_margin_tokens", DEFAULT_SAFETY_MARGIN_TOKENS)
+        - template.static_tokens(chars_per_token)
+        - sum(estimate_tokens(text, chars_per_token)
+              for text in (system_prompt, question_text, answer_text, rubric_criteria))
+    )
+    if estimate_tokens(normative, chars_per_token) > available:
+        print(f"[WARN] Промпт не помещается в окно контекста, норматив сокращён до {max(available, 0)} токенов",
+              file=sys.stderr)
+        normative = truncate_to_tokens(normative, max(available, 0), chars_per_token)
+
+    user_content = template.render(
+        question_text=question_text,
+        answer_text=answer_text,
+        normative_content=normative,
+        rubric_criteria=rubric_criteria
     )
 
     return {
@@ -115,7 +231,7 @@ def build_llm_request(
         "messages": [
             {
                 "role": "system",
-                "content": prompts.get("system", "")
+                "content": system_prompt
             },
             {
                 "role": "user",
@@ -125,15 +241,55 @@ def build_llm_request(
     }
 
 
-def call_llm(llm_request: dict, config: dict) -> dict:
+def create_llm_client(config: dict, max_concurrency: int = 1):
+    """
+    Долгоживущий HTTP-клиент для LLM API с пулом соединений и keep-alive.
+
+    Создаётся один раз на процесс (CheckHandler.initialize) и передаётся в
+    call_llm, чтобы не открывать новое TLS-соединение на каждую проверку.
+    Лимиты пула — llm.pool, адрес API — llm.base_url (например, локальная
+    заглушка для тестов). Клиент обёрнут в ResilientClient: повторы,
+    circuit breaker и hedging по llm.retry, llm.breaker, llm.hedge;
+    max_concurrency — сколько вызовов идёт одновременно (пул проверок сервера).
+    Возвращает None, если httpx не установлен.
+    """
+    try:
+        import httpx
+    except ImportError:
+        print("[WARN] httpx не установлен, пул соединений LLM не создан", file=sys.stderr)
+        return None
+
+    llm_config = config["llm"]
+    pool_config = llm_config.get("pool", {})
+    return ResilientClient(httpx.Client(
+        base_url=llm_config.get("base_url", DEFAULT_LLM_BASE_URL),
+        timeout=llm_config.get("timeout", DEFAULT_LLM_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=pool_config.get("max_connections", 20),
+            max_keepalive_connections=pool_config.get("max_keepalive_connections", 10),
+            keepalive_expiry=pool_config.get("keepalive_expiry", 30.0),
+        ),
+    ), llm_config, max_concurrency=max_concurrency)
+
+
+def call_llm(llm_request: dict, config: dict, client=None,
+             on_field: Optional[Callable[[str, object], None]] = None) -> dict:
     """
     Вызов LLM API (Anthropic Claude).
 
     Возвращает структурированный результат проверки.
-    При отсутствии API-ключа возвращает демо-результат.
-    """
-    import re
+    Демо-результат возвращается только без API-ключа или без httpx.
+    client — клиент из create_llm_client; без него выполняется разовый запрос.
+
+    С llm.stream: true ответ читается потоком (SSE) и разбирается по мере
+    поступления: on_field(ключ, значение) получает каждое готовое поле
+    вердикта сразу, а остаток потока дочитывается (до llm.stream_drain_chars
+    символов), чтобы соединение вернулось в пул и usage был точным.
 
+    Бросает LLMUnavailable, если API не ответил после повторов (или breaker
+    открыт), и RuntimeError при ошибке запроса или ответе без JSON —
+    студент не должен получить демо-вердикт вместо настоящей проверки.
+    """
     provider = config["llm"]["provider"]
     api_key = os.environ.get("ANTHROPIC_API_KEY")
 
@@ -145,60 +301,81 @@ def call_llm(llm_request: dict, config: dict) -> dict:
         print("[WARN] ANTHROPIC_API_KEY не установлен, возвращаем демо-результат", file=sys.stderr)
         return _get_demo_result()
 
-    # Реальный вызов Claude API
     try:
-        import httpx
-
-        response = httpx.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            },
-            json={
-                "model": llm_request["model"],
-                "max_tokens": llm_request["max_tokens"],
-                "temperature": llm_request["temperature"],
-                "system": llm_request["messages"][0]["content"],
-                "messages": [
-                    {"role": "user", "content": llm_request["messages"][1]["content"]}
-                ]
-            },
-            timeout=60.0
-        )
-
-        if response.status_code != 200:
-            print(f"[ERROR] Claude API вернул {response.status_code}: {response.text}", file=sys.stderr)
-            return _get_demo_result()
-
-        data = response.json()
-        content = data.get("content", [{}])[0].get("text", "{}")
-
-        # Извлекаем JSON из ответа
-        json_match = re.search(r'\{[\s\S]*\}', content)
-        if json_match:
-            result = json.loads(json_match.group())
-            print(f"[INFO] Получен результат: verdict={result.get('verdict')}, score={result.get('score')}", file=sys.stderr)
-            return result
-        else:
-            print(f"[WARN] Не удалось извлечь JSON из ответа", file=sys.stderr)
-            return _get_demo_result()
-
+        import httpx  # без httpx — демо-режим, как без ключа
     except ImportError:
         print("[WARN] httpx не установлен, возвращаем демо-результат. Установите: pip install httpx", file=sys.stderr)
         return _get_demo_result()
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] Ошибка парсинга JSON: {e}", file=sys.stderr)
-        return _get_demo_result()
-    except Exception as e:
-        print(f"[ERROR] Ошибка вызова API: {e}", file=sys.stderr)
-        return _get_demo_result()
+
+    stream = bool(config["llm"].get("stream", False))
+
+    # Реальный вызов Claude API; без переданного клиента (CLI) — разовый клиент
+    one_off = client is None
+    if one_off:
+        client = create_llm_client(config)
+    try:
+        with observe_stage("llm_call"):
+            response = client.post(
+                "/v1/messages",
+                stream=stream,
+                headers={
+                    "x-api-key": api_key,
+                    "anthropic-version": "2023-06-01",
+                    "content-type": "application/json"
+                },
+                json={
+                    "model": llm_request["model"],
+                    "max_tokens": llm_request["max_tokens"],
+                    "temperature": llm_request["temperature"],
+                    "system": llm_request["messages"][0]["content"],
+                    "messages": [
+                        {"role": "user", "content": llm_request["messages"][1]["content"]}
+                    ],
+                    "stream": stream
+                }
+            )
+            try:
+                if response.status_code != 200:
+                    if stream:
+                        response.read()
+                    raise RuntimeError(f"Claude API вернул {response.status_code}: {response.text}")
+
+                if stream:
+                    result, usage = read_message_stream(
+                        response.iter_lines(), on_field,
+                        config["llm"].get("stream_drain_chars", DEFAULT_DRAIN_CHARS))
+                else:
+                    data = response.json()
+                    content = data.get("content", [{}])[0].get("text", "{}")
+                    usage = data.get("usage") or {}
+                    with observe_stage("json_extraction"):
+                        result = extract_json_object(content)
+            finally:
+                if stream:
+                    response.close()
+    finally:
+        if one_off:
+            client.close()
+
+    for token_type in ("input", "output"):
+        if usage.get(f"{token_type}_tokens"):
+            LLM_TOKENS.inc(token_type, amount=usage[f"{token_type}_tokens"])
+
+    if result is None:
+        raise RuntimeError("Не удалось извлечь JSON из ответа LLM")
+
+    if not stream and on_field is not None:
+        for key, value in result.items():
+            on_field(key, value)
+
+    print(f"[INFO] Получен результат: verdict={result.get('verdict')}, score={result.get('score')}", file=sys.stderr)
+    return result
 
 
 def _get_demo_result() -> dict:
-    """Демо-результат для тестирования без API."""
+    """Демо-результат для тестирования без API (помечен demo, не кэшируется)."""
     return {
+        "demo": True,
         "verdict": "needs_revision",
         "score": 75,
         "strengths": [
@@ -216,50 +393,129 @@ def _get_demo_result() -> dict:
     }
 
 
-def format_comment(llm_result: dict, context: dict, config: dict) -> str:
-    """Форматирование комментария для студента (Markdown)."""
+# Блоки комментария по порядку и поля вердикта, нужные для каждого
+COMMENT_BLOCKS = (
+    ("header", ("verdict", "score")),
+    ("strengths", ("strengths",)),
+    ("issues", ("issues",)),
+    ("next_step", ("next_step",)),
+    ("footer", ()),
+)
+
 
-    verdicts = config.get("verdicts", {})
-    verdict_info = verdicts.get(llm_result.get("verdict", "unknown"), {})
+def format_comment_block(block: str, llm_result: dict, context: dict, config: dict) -> List[str]:
+    """Строки одного блока комментария (пустой список, если блок не нужен)."""
+    lines = []
 
-    emoji = verdict_info.get("emoji", "?")
-    text = verdict_info.get("text", llm_result.get("verdict", "?"))
-    score = llm_result.get("score", 0)
+    if block == "header":
+        verdicts = config.get("verdicts", {})
+        verdict_info = verdicts.get(llm_result.get("verdict", "unknown"), {})
 
-    lines = [f"**{emoji} {text}** ({score}/100)\n"]
+        emoji = verdict_info.get("emoji", "?")
+        text = verdict_info.get("text", llm_result.get("verdict", "?"))
+        score = llm_result.get("score", 0)
+
+        lines.append(f"**{emoji} {text}** ({score}/100)\n")
 
     # Сильные стороны
-    strengths = llm_result.get("strengths", [])
-    if strengths:
-        lines.append("**Сильные стороны:**")
-        for s in strengths:
-            lines.append(f"- {s}")
-        lines.append("")
+    elif block == "strengths":
+        strengths = llm_result.get("strengths", [])
+        if strengths:
+            lines.append("**Сильные стороны:**")
+            for s in strengths:
+                lines.append(f"- {s}")
+            lines.append("")
 
     # Замечания
-    issues = llm_result.get("issues", [])
-    if issues:
-        lines.append("**Замечания:**")
-        for issue in issues:
-            lines.append(f"- {issue.get('issue', '')}")
-            if issue.get("suggestion"):
-                lines.append(f"  _Рекомендация: {issue['suggestion']}_")
-        lines.append("")
+    elif block == "issues":
+        issues = llm_result.get("issues", [])
+        if issues:
+            lines.append("**Замечания:**")
+            for issue in issues:
+                lines.append(f"- {issue.get('issue', '')}")
+                if issue.get("suggestion"):
+                    lines.append(f"  _Рекомендация: {issue['suggestion']}_")
+            lines.append("")
 
     # Следующий шаг
-    next_step = llm_result.get("next_step")
-    if next_step:
-        lines.append(f"**Следующий шаг:**\n{next_step}\n")
+    elif block == "next_step":
+        next_step = llm_result.get("next_step")
+        if next_step:
+            lines.append(f"**Следующий шаг:**\n{next_step}\n")
 
     # Метаинформация
-    lines.append("---")
-    lines.append(f"*Проверено: {config['llm']['model']}*")
-    lines.append(f"*По материалам: {context.get('section_name', 'N/A')}*")
+    elif block == "footer":
+        lines.append("---")
+        lines.append(f"*Проверено: {config['llm']['model']}*")
+        lines.append(f"*По материалам: {context.get('section_name', 'N/A')}*")
+
+    return lines
 
+
+def format_comment(llm_result: dict, context: dict, config: dict) -> str:
+    """Форматирование комментария для студента (Markdown)."""
+    lines = []
+    for block, _ in COMMENT_BLOCKS:
+        lines.extend(format_comment_block(block, llm_result, context, config))
     return "\n".join(lines)
 
 
-def check_answer(request: dict, config: dict, prompts: dict) -> dict:
+class CommentStream:
+    """
+    Комментарий, отдаваемый по блокам по мере готовности полей вердикта.
+
+    field() получает поля из call_llm(on_field=...); блок отправляется в
+    write, когда готовы его поля и все предыдущие блоки. finish() дописывает
+    остальное по полному вердикту. Склеенные части равны format_comment.
+    """
+
+    def __init__(self, context: dict, config: dict, write: Callable[[str], None]):
+        self.context = context
+        self.config = config
+        self.write = write
+        self.fields = {}
+        self.parts: List[str] = []
+        self._next = 0
+
+    def field(self, key: str, value):
+        self.fields[key] = value
+        self._flush(final=False)
+
+    def finish(self, llm_result: dict) -> str:
+        self.fields = llm_result
+        self._flush(final=True)
+        return "".join(self.parts)
+
+    def _flush(self, final: bool):
+        while self._next < len(COMMENT_BLOCKS):
+            block, required = COMMENT_BLOCKS[self._next]
+            if not final and (not required or not all(key in self.fields for key in required)):
+                return
+            self._next += 1
+            lines = format_comment_block(block, self.fields, self.context, self.config)
+            if lines:
+                part = ("\n" if self.parts else "") + "\n".join(lines)
+                self.parts.append(part)
+                self.write(part)
+
+
+def create_result_cache(config: dict) -> Optional[ResultCache]:
+    """Кэш результатов по секции cache конфигурации (None, если выключен)."""
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+
+    sqlite_path = cache_config.get("sqlite_path")
+    return ResultCache(
+        max_entries=cache_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+        ttl=cache_config.get("ttl", DEFAULT_TTL),
+        sqlite_path=AGENT_ROOT / sqlite_path if sqlite_path else None,
+    )
+
+
+def check_answer(request: dict, config: dict, prompts: dict, client=None,
+                 cache: Optional[ResultCache] = None, store: Optional[ContextStore] = None,
+                 on_comment: Optional[Callable[[str], None]] = None) -> dict:
     """
     Основная функция проверки одного ответа (v0.1).
 
@@ -267,31 +523,65 @@ def check_answer(request: dict, config: dict, prompts: dict) -> dict:
         request: словарь с полями answer_text, question_text, course_name, section_name
         config: конфигурация
         prompts: промпты
+        client: HTTP-клиент LLM из create_llm_client (опционально)
+        cache: кэш результатов из create_result_cache (опционально)
+        store: предзагруженный контекст из create_context_store (опционально)
+        on_comment: получает комментарий частями по мере разбора вердикта
+            (потоковая отдача в LMS, опционально)
 
     Returns:
         словарь с полями comment, checked_at
+        (и metadata.cache = "hit" / "miss", если кэш включён)
     """
 
-    # 1. Получить контекст из репозитория руководств
-    context = get_check_context(
-        course_name=request["course_name"],
-        section_name=request["section_name"],
-        config=config
-    )
-
-    # 2. Собрать запрос к LLM
-    llm_request = build_llm_request(request, context, prompts, config)
-
-    # 3. Вызвать LLM
-    llm_result = call_llm(llm_request, config)
-
-    # 4. Сформировать комментарий
-    comment = format_comment(llm_result, context, config)
-
-    return {
+    with observe_stage("total"):
+        # 1. Получить контекст из репозитория руководств
+        with observe_stage("context_load"):
+            context = get_check_context(
+                course_name=request["course_name"],
+                section_name=request["section_name"],
+                config=config,
+                store=store
+            )
+
+        # 2. Тот же ответ с теми же рубрикой, промптами и моделью уже проверялся?
+        llm_result = None
+        if cache is not None:
+            key = cache_key(request, context.get("rubric"), prompts, config["llm"],
+                            context.get("normative_content", ""))
+            llm_result = cache.get(key)
+            CACHE_LOOKUPS.inc("hit" if llm_result is not None else "miss")
+        cache_hit = llm_result is not None
+        comment_stream = CommentStream(context, config, on_comment) if on_comment is not None else None
+
+        if not cache_hit:
+            # 3. Собрать запрос к LLM
+            with observe_stage("prompt_build"):
+                llm_request = build_llm_request(request, context, prompts, config)
+
+            # 4. Вызвать LLM; демо-результаты (нет ключа или httpx) не кэшируются
+            llm_result = call_llm(llm_request, config, client,
+                                  on_field=comment_stream.field if comment_stream is not None else None)
+            if cache is not None and not llm_result.get("demo"):
+                cache.put(key, llm_result)
+
+        # 5. Сформировать комментарий
+        with observe_stage("comment_formatting"):
+            if comment_stream is not None:
+                comment = comment_stream.finish(llm_result)
+            else:
+                comment = format_comment(llm_result, context, config)
+
+    result = {
         "comment": comment,
         "checked_at": datetime.now(timezone.utc).isoformat()
     }
+    if cache is not None:
+        result["metadata"] = {"cache": "hit" if cache_hit else "miss"}
+    if llm_result.get("demo"):
+        # LMS не должна выдавать демо-вердикт студенту как настоящую проверку
+        result.setdefault("metadata", {})["demo"] = True
+    return result
 
 
 def main():
@@ -309,6 +599,7 @@ def main():
     config_path = Path(args.config) if args.config else DEFAULT_CONFIG
     config = load_config(config_path)
     prompts = load_prompts(config)
+    cache = create_result_cache(config)
 
     # Чтение входных данных
     if args.input:
@@ -318,7 +609,14 @@ def main():
         request = json.load(sys.stdin)
 
     # Проверка
-    result = check_answer(request, config, prompts)
+    try:
+        result = check_answer(request, config, prompts, cache=cache)
+    except LLMUnavailable as e:
+        print(f"[ERROR] {e}. Повторите через {e.retry_after:.0f} с", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
 
     # Вывод
     output_text = json.dumps(result, ensure_ascii=False, indent=2)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Предзагруженный контекст проверки: рубрики и карта вопросов.
+
+Раньше get_check_context открывал и парсил data/rubrics.yaml на каждый
+запрос. ContextStore загружает рубрики и questions_map.yaml один раз и
+строит неизменяемый снимок (ContextSnapshot):
+
+- rubrics: рубрики по id;
+- rubric_prompts: текст рубрики для промпта (format_rubric_for_prompt),
+  посчитанный заранее;
+- sections: запись карты вопросов по (курс, раздел) — курс задаётся id или
+  названием, раздел — guide_section или названием вопроса; сравнение без
+  учёта регистра, лишних пробелов и нумерации вида "1.1.";
+- course_roots: guide_root курса по id или названию — для разделов вне
+  карты вопросов норматив ищется по заголовкам руководств курса.
+
+Индекс разделов руководств (guide_index.GuideIndex) хранится рядом со
+снимком в ContextStore.guides.
+
+Горячая перезагрузка: не чаще раза в reload_interval секунд снимок сверяет
+mtime исходных файлов и при изменении атомарно заменяется новым. Запросы,
+уже получившие снимок, дорабатывают со старым. Индекс руководств так же
+пересоздаётся при изменении руководств; старый индекс закрывается.
+"""
+
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import yaml
+
+DEFAULT_RUBRIC_ID = "rubric_conceptual_understanding"
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+_NUMBERING = re.compile(r"^\s*(\d+\.)+\d*\s*")
+
+
+def normalize_title(title: str) -> str:
+    """Название курса/раздела для сравнения: без нумерации, регистра и лишних пробелов."""
+    return " ".join(_NUMBERING.sub("", str(title)).casefold().split())
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """Неизменяемый снимок рубрик и карты вопросов."""
+
+    rubrics: Mapping[str, dict]
+    rubric_prompts: Mapping[str, str]
+    sections: Mapping[Tuple[str, str], dict]
+    course_roots: Mapping[str, str]
+    mtimes: Tuple[Tuple[str, float], ...]
+
+    def find_section(self, course_name: str, section_name: str) -> Optional[dict]:
+        """Запись карты вопросов для (курс, раздел) или None."""
+        return self.sections.get((normalize_title(course_name), normalize_title(section_name)))
+
+    def course_root(self, course_name: str) -> Optional[str]:
+        """guide_root курса (относительно корня репозитория) или None."""
+        return self.course_roots.get(normalize_title(course_name))
+
+    def rubric_for(self, rubric_id: Optional[str]) -> Tuple[dict, str]:
+        """Рубрика и её текст для промпта; неизвестный id — рубрика по умолчанию."""
+        if rubric_id not in self.rubrics:
+            rubric_id = DEFAULT_RUBRIC_ID
+        return self.rubrics.get(rubric_id, {}), self.rubric_prompts.get(rubric_id, "")
+
+
+def _file_mtimes(paths) -> Tuple[Tuple[str, float], ...]:
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append((str(path), path.stat().st_mtime))
+        except OSError:
+            mtimes.append((str(path), 0.0))
+    return tuple(mtimes)
+
+
+def build_snapshot(rubrics_path: Path, questions_map_path: Path,
+                   format_rubric: Callable[[dict], str]) -> ContextSnapshot:
+    """Читает рубрики и карту вопросов и строит снимок."""
+    mtimes = _file_mtimes((rubrics_path, questions_map_path))
+
+    with open(rubrics_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    rubrics = data.get("rubrics") if isinstance(data, dict) else None
+    if not isinstance(rubrics, dict) or not rubrics:
+        raise ValueError(f"{rubrics_path}: нет секции rubrics")
+
+    questions_map = {}
+    if questions_map_path.exists():
+        with open(questions_map_path, "r", encoding="utf-8") as f:
+            questions_map = yaml.safe_load(f) or {}
+        if not isinstance(questions_map, dict):
+            raise ValueError(f"{questions_map_path}: ожидается словарь")
+
+    sections: Dict[Tuple[str, str], dict] = {}
+    course_roots: Dict[str, str] = {}
+    for course_id, course in (questions_map.get("courses") or {}).items():
+        course_keys = {normalize_title(course_id), normalize_title(course.get("title", course_id))}
+        if course.get("guide_root"):
+            for course_key in course_keys:
+                course_roots.setdefault(course_key, course["guide_root"])
+        for question_id, question in (course.get("questions") or {}).items():
+            entry = MappingProxyType(dict(
+                question,
+                question_id=question_id,
+                course_id=course_id,
+                guide_root=course.get("guide_root"),
+            ))
+            section_keys = {normalize_title(question.get("guide_section", "")),
+                            normalize_title(question.get("title", ""))} - {""}
+            for course_key in course_keys:
+                for section_key in section_keys:
+                    # При совпадении разделов побеждает первый вопрос в карте
+                    sections.setdefault((course_key, section_key), entry)
+
+    return ContextSnapshot(
+        rubrics=MappingProxyType(dict(rubrics)),
+        rubric_prompts=MappingProxyType({rid: format_rubric(r) for rid, r in rubrics.items()}),
+        sections=MappingProxyType(sections),
+        course_roots=MappingProxyType(course_roots),
+        mtimes=mtimes,
+    )
+
+
+class ContextStore:
+    """Текущий снимок контекста с проверкой изменений файлов."""
+
+    def __init__(self, rubrics_path: Path, questions_map_path: Path,
+                 format_rubric: Callable[[dict], str],
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+                 guides_factory: Optional[Callable[[], object]] = None):
+        self.rubrics_path = rubrics_path
+        self.questions_map_path = questions_map_path
+        self.format_rubric = format_rubric
+        self.reload_interval = reload_interval
+        self.guides_factory = guides_factory
+        # GuideIndex или None, если руководств нет
+        self.guides = guides_factory() if guides_factory is not None else None
+        self._lock = threading.Lock()
+        self._snapshot = build_snapshot(rubrics_path, questions_map_path, format_rubric)
+        self._checked_at = time.monotonic()
+
+    def snapshot(self) -> ContextSnapshot:
+        """Актуальный снимок; файлы проверяются не чаще reload_interval."""
+        if self.reload_interval > 0 and time.monotonic() - self._checked_at >= self.reload_interval:
+            self._maybe_reload()
+        return self._snapshot
+
+    def _maybe_reload(self):
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.reload_interval:
+                return  # уже проверил другой поток
+            self._checked_at = time.monotonic()
+            if self.guides is not None and self.guides.changed():
+                self._reload_guides()
+            paths = (self.rubrics_path, self.questions_map_path)
+            if _file_mtimes(paths) == self._snapshot.mtimes:
+                return
+            try:
+                self._snapshot = build_snapshot(self.rubrics_path, self.questions_map_path, self.format_rubric)
+                print("[INFO] Рубрики и карта вопросов перезагружены", file=sys.stderr)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                # Битый файл при редактировании: работаем со старым снимком
+                print(f"[WARN] Не удалось перезагрузить контекст: {e}", file=sys.stderr)
+
+    def _reload_guides(self):
+        try:
+            guides = self.guides_factory()
+        except OSError as e:
+            print(f"[WARN] Не удалось переиндексировать руководства: {e}", file=sys.stderr)
+            return
+        old, self.guides = self.guides, guides
+        if old is not None:
+            old.close()  # отображения файлов старого индекса больше не нужны
+        print("[INFO] Руководства переиндексированы", file=sys.stderr)
+
+    def close(self):
+        """Закрывает индекс руководств."""
+        if self.guides is not None:
+            self.guides.close()
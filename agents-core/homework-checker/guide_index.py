@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Индекс разделов руководств для норматива проверки.
+
+Markdown-файлы под paths.guides_root один раз разбираются на разделы по
+заголовкам (#, ##, ...). Раздел — байтовый диапазон файла от заголовка до
+следующего заголовка того же или более высокого уровня (подразделы входят
+в раздел). Файлы отображаются в память (mmap): в куче хранятся только
+смещения, текст раздела читается срезом при запросе.
+
+Поиск:
+- section(file, title) — точное совпадение нормализованного заголовка в
+  файле, O(1) по словарю; иначе нечёткий поиск по заголовкам файла;
+- find(title, under) — нечёткий поиск по заголовкам всех файлов каталога
+  (для разделов вне карты вопросов).
+Результаты нечёткого поиска и декодированный текст частых разделов
+запоминаются в самом индексе (ограниченные словари).
+
+Индекс неизменяем: при изменении руководств (changed() сверяет mtime и
+размеры файлов) ContextStore строит новый индекс, а старый закрывает.
+Файлы обновляются заменой (git checkout, rsync), а не перезаписью на месте —
+иначе отображение в память увидит обрезанный файл.
+"""
+
+import difflib
+import mmap
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from context_store import normalize_title
+
+# Минимальная похожесть заголовков для нечёткого поиска (difflib ratio)
+FUZZY_CUTOFF = 0.6
+# Запомненных результатов нечёткого поиска (названия разделов приходят от LMS)
+FUZZY_CACHE_SIZE = 4096
+# Декодированных текстов разделов
+TEXT_CACHE_SIZE = 256
+
+_HEADING = re.compile(rb"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+_FENCE = re.compile(rb"^\s*(```|~~~)")
+
+
+@dataclass(frozen=True)
+class GuideSection:
+    """Раздел руководства: файл, заголовок и байтовый диапазон."""
+
+    file: str
+    title: str
+    level: int
+    start: int
+    end: int
+
+
+def split_sections(data: bytes, file_key: str) -> List[GuideSection]:
+    """Разделы Markdown-текста по заголовкам (заголовки в блоках кода пропускаются)."""
+    headings: List[Tuple[int, str, int]] = []  # (уровень, заголовок, смещение)
+    offset = 0
+    in_fence = False
+    for line in data.splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _HEADING.match(line.rstrip(b"\r\n"))
+            if match:
+                title = match.group(2).decode("utf-8", errors="replace")
+                headings.append((len(match.group(1)), title, offset))
+        offset += len(line)
+
+    sections = []
+    for i, (level, title, start) in enumerate(headings):
+        end = len(data)
+        for next_level, _, next_start in headings[i + 1:]:
+            if next_level <= level:
+                end = next_start
+                break
+        sections.append(GuideSection(file_key, title, level, start, end))
+    return sections
+
+
+class GuideIndex:
+    """Разделы всех руководств каталога с поиском по заголовку."""
+
+    def __init__(self, guides_root: Path):
+        self.guides_root = guides_root.resolve()
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._sections: Dict[Tuple[str, str], GuideSection] = {}
+        self._titles: Dict[str, List[Tuple[str, GuideSection]]] = {}  # файл → (нормализованный заголовок, раздел)
+        self._fuzzy: Dict[Tuple[str, str], Optional[GuideSection]] = {}
+        self._texts: Dict[GuideSection, str] = {}
+        self._lock = threading.Lock()
+
+        self.files = self._scan()
+        for path, _, _ in self.files:
+            self._add_file(Path(path))
+
+    def _scan(self) -> Tuple[Tuple[str, int, int], ...]:
+        """(путь, mtime, размер) всех руководств каталога."""
+        files = []
+        for path in sorted(self.guides_root.rglob("*.md")):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # файл удалён между обходом и stat
+            files.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(files)
+
+    def changed(self) -> bool:
+        """Изменились ли руководства с момента индексации."""
+        return self._scan() != self.files
+
+    def _add_file(self, path: Path):
+        file_key = os.path.abspath(path)
+        try:
+            with open(path, "rb") as f:
+                if path.stat().st_size == 0:
+                    return
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Руководство {path} не проиндексировано: {e}", file=sys.stderr)
+            return
+
+        self._maps[file_key] = mapped
+        titles = self._titles.setdefault(file_key, [])
+        for section in split_sections(mapped[:], file_key):
+            key = normalize_title(section.title)
+            # При одинаковых заголовках в файле побеждает первый
+            self._sections.setdefault((file_key, key), section)
+            titles.append((key, section))
+
+    @property
+    def stats(self) -> dict:
+        return {"files": len(self._maps), "sections": len(self._sections)}
+
+    def section(self, guide_file: Path, title: str) -> Optional[GuideSection]:
+        """Раздел файла по заголовку: точное совпадение, иначе нечёткое."""
+        file_key = os.path.abspath(guide_file)
+        key = normalize_title(title)
+        found = self._sections.get((file_key, key))
+        if found is not None or file_key not in self._titles:
+            return found
+        return self._closest(key, file_key)
+
+    def find(self, title: str, under: Optional[Path] = None) -> Optional[GuideSection]:
+        """Нечёткий поиск раздела по заголовку среди файлов каталога under (по умолчанию — всех)."""
+        scope = os.path.abspath(under if under is not None else self.guides_root)
+        return self._closest(normalize_title(title), scope)
+
+    def _closest(self, key: str, scope: str) -> Optional[GuideSection]:
+        """Самый похожий заголовок среди файлов scope (файл или каталог)."""
+        cache_key = (key, scope)
+        with self._lock:
+            if cache_key in self._fuzzy:
+                return self._fuzzy[cache_key]
+
+        files = [file_key for file_key in self._titles
+                 if file_key == scope or file_key.startswith(scope + os.sep)]
+        candidates = {}
+        for file_key in files:
+            for title_key, section in self._titles[file_key]:
+                candidates.setdefault(title_key, section)
+        match = difflib.get_close_matches(key, list(candidates), n=1, cutoff=FUZZY_CUTOFF)
+        found = candidates[match[0]] if match else None
+
+        with self._lock:
+            if len(self._fuzzy) >= FUZZY_CACHE_SIZE:
+                self._fuzzy.clear()
+            self._fuzzy[cache_key] = found
+        return found
+
+    def text(self, section: GuideSection) -> str:
+        """Текст раздела (частые разделы декодируются один раз)."""
+        with self._lock:
+            cached = self._texts.get(section)
+            if cached is not None:
+                return cached
+            mapped = self._maps.get(section.file)
+            # Срез под блокировкой: close() не закроет отображение посреди чтения
+            data = mapped[section.start:section.end] if mapped is not None else None
+        if data is None:
+            # Индекс закрыт перезагрузкой, пока запрос дорабатывал со старым разделом
+            with open(section.file, "rb") as f:
+                f.seek(section.start)
+                data = f.read(section.end - section.start)
+            return data.decode("utf-8", errors="replace").strip()
+
+        text = data.decode("utf-8", errors="replace").strip()
+        with self._lock:
+            if len(self._texts) >= TEXT_CACHE_SIZE:
+                self._texts.clear()
+            self._texts[section] = text
+        return text
+
+    def close(self):
+        """Закрывает отображения файлов и сбрасывает кэши."""
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._texts.clear()
+            self._fuzzy.clear()
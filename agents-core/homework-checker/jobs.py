@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Асинхронные задания ДЗ-чекера: POST /jobs → job_id, GET /jobs/<id> → статус.
+
+Задание хранится в памяти процесса (JobStore) и выполняется в общем пуле
+проверок сервера. Статусы: queued → running → done | failed. Завершённые
+задания удаляются через ttl секунд. Если в запросе указан callback_url,
+по завершении на него отправляется POST с тем же JSON, что отдаёт GET /jobs/<id>.
+
+Webhook отправляется отдельным небольшим пулом (WebhookSender), а не
+потоком проверки: медленный или недоступный получатель не занимает слот
+LLM. callback_url принимается только http(s) и только для хостов из
+server.jobs.callback_hosts (check_callback_url) — сервер не должен
+обращаться по произвольным адресам из своей сети; редиректы не выполняются.
+"""
+
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+DEFAULT_JOB_TTL = 3600
+DEFAULT_WEBHOOK_TIMEOUT = 10.0
+DEFAULT_WEBHOOK_WORKERS = 2
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobStore:
+    """Потокобезопасное хранилище заданий с вытеснением завершённых по TTL."""
+
+    def __init__(self, ttl: float = DEFAULT_JOB_TTL):
+        self.ttl = ttl
+        self._jobs: Dict[str, dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self, callback_url: Optional[str] = None) -> dict:
+        self._evict()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job, callback_url=callback_url)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Снимок задания для ответа (без callback_url) или None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {k: v for k, v in job.items() if k != "callback_url"}
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if job["status"] in FINISHED_STATUSES:
+                self._finished_at[job_id] = time.monotonic()
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._finished_at.pop(job_id, None)
+
+    def callback_url(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.get("callback_url") if job else None
+
+    def counts(self) -> Dict[str, int]:
+        """Число заданий по статусам."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def _evict(self):
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, finished in self._finished_at.items() if finished < deadline]
+            for job_id in expired:
+                self._jobs.pop(job_id, None)
+                del self._finished_at[job_id]
+
+
+def check_callback_url(url, allowed_hosts: Iterable[str]) -> Optional[str]:
+    """
+    Ошибка валидации callback_url или None, если адрес допустим.
+
+    allowed_hosts — имена хостов; "*.example.com" разрешает поддомены.
+    Пустой список запрещает webhook совсем.
+    """
+    if not isinstance(url, str):
+        return "callback_url must be a string"
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "callback_url must be an http(s) URL"
+    host = parsed.hostname.lower()
+    for allowed in allowed_hosts:
+        allowed = allowed.lower()
+        if host == allowed or (allowed.startswith("*.") and host.endswith(allowed[1:])):
+            return None
+    return f"callback_url host is not allowed: {host}"
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Редирект получателя не должен уводить запрос на другой хост."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise urllib.error.HTTPError(req.full_url, code, f"redirect to {newurl} refused", headers, fp)
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def send_webhook(url: str, payload: dict, timeout: float = DEFAULT_WEBHOOK_TIMEOUT):
+    """POST payload на callback_url; ошибки только логируются."""
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    request = urllib.request.Request(
+        url, data=data, method="POST",
+        headers={"Content-Type": "application/json; charset=utf-8"},
+    )
+    try:
+        with _opener.open(request, timeout=timeout) as response:
+            response.read()
+    except Exception as e:
+        print(f"[WARN] Webhook {url} не доставлен: {e}", file=sys.stderr)
+
+
+class WebhookSender:
+    """Отправка webhook в отдельном пуле, не занимая потоки проверок."""
+
+    def __init__(self, timeout: float = DEFAULT_WEBHOOK_TIMEOUT, max_workers: int = DEFAULT_WEBHOOK_WORKERS):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="webhook")
+
+    def send(self, url: str, payload: dict):
+        self._executor.submit(send_webhook, url, payload, self.timeout)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
+
+
+def run_job(store: JobStore, job_id: str, fn: Callable, *args,
+            webhooks: Optional[WebhookSender] = None):
+    """Выполняет fn(*args) как задание job_id: статусы, результат, webhook (через webhooks)."""
+    store.update(job_id, status="running", started_at=_now())
+    try:
+        result = fn(*args)
+    except Exception as e:
+        print(f"[ERROR] Ошибка задания {job_id}: {e}", file=sys.stderr)
+        store.update(job_id, status="failed", error=f"Internal error: {e}", finished_at=_now())
+    else:
+        store.update(job_id, status="done", result=result, finished_at=_now())
+
+    callback_url = store.callback_url(job_id)
+    if callback_url and webhooks is not None:
+        webhooks.send(callback_url, store.get(job_id))
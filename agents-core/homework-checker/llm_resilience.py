@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Устойчивый вызов LLM API: повторы, circuit breaker и hedged-запросы.
+
+ResilientClient оборачивает httpx.Client из create_llm_client и повторяет
+его post() с той же сигнатурой:
+
+- повторы: 429, 5xx и 529 (overloaded), а также сетевые ошибки повторяются
+  до retry.max_attempts раз с экспоненциальной задержкой и полным jitter;
+  заголовок retry-after провайдера имеет приоритет над расчётной задержкой;
+- circuit breaker: после breaker.failure_threshold неудач подряд вызовы
+  сразу отклоняются (LLMUnavailable) на breaker.reset_timeout секунд, затем
+  один пробный запрос решает, закрыть ли его снова;
+- hedging (hedge.enabled): если ответ не пришёл за p95 задержки успешных
+  вызовов, отправляется дубликат и берётся первый успешный ответ. Число
+  одновременных дубликатов ограничено hedge.max_in_flight, а при открытом
+  breaker дубликаты не отправляются, чтобы не усиливать перегрузку.
+  Пул hedging рассчитан на max_concurrency основных запросов (server.max_in_flight)
+  плюс дубликаты: основные запросы не ждут в его очереди, и её задержка не
+  попадает в p95.
+
+С post(..., stream=True) ответ возвращается сразу после заголовков (тело
+читает вызывающий и закрывает response); повторяются только ответы с
+кодом ошибки до начала тела, hedging для потоков не применяется.
+
+Если ответа так и не получено, бросается LLMUnavailable с retry_after —
+сервер отвечает 503 вместо демо-результата.
+"""
+
+import email.utils
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+from metrics import LLM_ATTEMPTS
+
+try:
+    import httpx
+    TRANSIENT_ERRORS = (httpx.TransportError,)
+except ImportError:
+    httpx = None
+    TRANSIENT_ERRORS = (OSError,)
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504, 529})
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 20.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MAX_IN_FLIGHT = 4
+
+
+class LLMUnavailable(Exception):
+    """Провайдер LLM недоступен: повторы исчерпаны или breaker открыт."""
+
+    def __init__(self, message: str, retry_after: float = DEFAULT_RESET_TIMEOUT):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """retry-after в секундах: число или HTTP-дата."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Breaker по числу неудач подряд: closed → open → half-open → closed."""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def retry_after(self) -> float:
+        """Секунд до пробного запроса."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос; в half-open пропускается один пробный."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    print(f"[WARN] LLM API: {self._failures} неудач подряд, breaker открыт "
+                          f"на {self.reset_timeout:g} с", file=sys.stderr)
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class LatencyWindow:
+    """Задержки последних успешных вызовов для оценки p95."""
+
+    def __init__(self, size: int = 200, min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._values.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._values) < self.min_samples:
+                return None
+            values = sorted(self._values)
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+class ResilientClient:
+    """httpx.Client с повторами, circuit breaker и hedged-запросами."""
+
+    def __init__(self, client, config: dict, max_concurrency: int = 1):
+        self.client = client
+        retry_config = config.get("retry", {})
+        self.max_attempts = max(1, retry_config.get("max_attempts", DEFAULT_MAX_ATTEMPTS))
+        self.base_delay = retry_config.get("base_delay", DEFAULT_BASE_DELAY)
+        self.max_delay = retry_config.get("max_delay", DEFAULT_MAX_DELAY)
+
+        breaker_config = config.get("breaker", {})
+        self.breaker = CircuitBreaker(
+            failure_threshold=breaker_config.get("failure_threshold", DEFAULT_FAILURE_THRESHOLD),
+            reset_timeout=breaker_config.get("reset_timeout", DEFAULT_RESET_TIMEOUT),
+        )
+
+        hedge_config = config.get("hedge", {})
+        self.latencies = LatencyWindow(min_samples=hedge_config.get("min_samples", DEFAULT_HEDGE_MIN_SAMPLES))
+        self._hedge_pool = None
+        if hedge_config.get("enabled", False):
+            max_hedges = hedge_config.get("max_in_flight", DEFAULT_HEDGE_MAX_IN_FLIGHT)
+            self._hedge_slots = threading.BoundedSemaphore(max_hedges)
+            # Основной запрос тоже выполняется в пуле, чтобы ждать оба ответа;
+            # поток есть у каждого одновременного вызова и каждого дубликата
+            self._hedge_pool = ThreadPoolExecutor(
+                max_workers=max(1, max_concurrency) + max_hedges, thread_name_prefix="llm-hedge")
+
+    def post(self, url: str, stream: bool = False, **kwargs):
+        """POST с повторами; возвращает успешный ответ или бросает LLMUnavailable."""
+        last_error = "нет ответа"
+        for attempt in range(1, self.max_attempts + 1):
+            if not self.breaker.allow():
+                LLM_ATTEMPTS.inc("rejected")
+                raise LLMUnavailable("LLM API недоступен (breaker открыт)",
+                                     retry_after=self.breaker.retry_after())
+
+            try:
+                response = self._send(url, kwargs, stream)
+            except Exception:
+                self.breaker.record_failure()  # не оставлять breaker в half-open
+                raise
+            if isinstance(response, Exception):
+                last_error = f"{type(response).__name__}: {response}"
+                retry_after = None
+            elif response.status_code in RETRY_STATUSES:
+                last_error = f"HTTP {response.status_code}"
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+            else:
+                # Успех или ошибка запроса (4xx) — провайдер жив, повтор не поможет
+                self.breaker.record_success()
+                LLM_ATTEMPTS.inc("ok" if response.status_code == 200 else "client_error")
+                return response
+
+            self.breaker.record_failure()
+            if attempt == self.max_attempts or self.breaker.state == "open":
+                LLM_ATTEMPTS.inc("failed")
+                break
+
+            delay = retry_after if retry_after is not None else random.uniform(
+                0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+            if delay > self.max_delay:
+                # Провайдер просит ждать дольше, чем разумно держать проверку
+                LLM_ATTEMPTS.inc("failed")
+                break
+            LLM_ATTEMPTS.inc("retry")
+            print(f"[WARN] LLM API: {last_error}, повтор {attempt + 1}/{self.max_attempts} "
+                  f"через {delay:.1f} с", file=sys.stderr)
+            time.sleep(delay)
+
+        raise LLMUnavailable(f"LLM API недоступен после {attempt} попыток: {last_error}",
+                             retry_after=max(self.base_delay, retry_after or self.breaker.retry_after() or 5.0))
+
+    def _attempt(self, url: str, kwargs: dict, stream: bool = False):
+        """Один запрос: ответ или исключение сетевого уровня (не бросается)."""
+        started = time.perf_counter()
+        try:
+            if stream:
+                response = self.client.send(self.client.build_request("POST", url, **kwargs), stream=True)
+                if response.status_code in RETRY_STATUSES:
+                    response.close()  # тело ошибки не нужно, соединение освобождается
+                return response
+            response = self.client.post(url, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            return e
+        if response.status_code == 200:
+            self.latencies.add(time.perf_counter() - started)
+        return response
+
+    def _send(self, url: str, kwargs: dict, stream: bool = False):
+        """Запрос с дубликатом после p95, если hedging включён и есть статистика."""
+        if stream:
+            return self._attempt(url, kwargs, stream=True)
+        hedge_after = self.latencies.p95() if self._hedge_pool is not None else None
+        if hedge_after is None:
+            return self._attempt(url, kwargs)
+
+        pending = {self._hedge_pool.submit(self._attempt, url, kwargs)}
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done and self.breaker.state == "closed" and self._hedge_slots.acquire(blocking=False):
+            LLM_ATTEMPTS.inc("hedge")
+            hedge = self._hedge_pool.submit(self._attempt, url, kwargs)
+            hedge.add_done_callback(lambda _: self._hedge_slots.release())
+            pending.add(hedge)
+
+        result = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if not isinstance(result, Exception) and result.status_code not in RETRY_STATUSES:
+                    return result  # второй запрос доработает в фоне, его ответ не нужен
+        return result
+
+    def close(self):
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self.client.close()
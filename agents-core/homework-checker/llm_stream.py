@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Потоковый ответ LLM: server-sent events и пошаговый разбор JSON вердикта.
+
+- JsonObjectScanner: линейный разбор JSON-объекта по мере поступления
+  текста (учитываются строки, экранирование и вложенность). Каждое
+  завершённое поле верхнего уровня отдаётся сразу — так комментарий можно
+  начать отправлять в LMS до конца генерации. Текст до первой "{" и после
+  закрывающей "}" игнорируется; кандидат, не разобравшийся как JSON,
+  отбрасывается, и поиск продолжается со следующей "{".
+- extract_json_object: тот же разбор для готового ответа вместо жадного
+  re.search(r'\\{[\\s\\S]*\\}'), который на длинных ответах с несколькими
+  фигурными скобками захватывал лишнее.
+- read_message_stream: события Anthropic Messages API (stream: true).
+  Поля вердикта отдаются по мере закрытия, поэтому комментарий уходит в
+  LMS до конца генерации. Остаток потока после вердикта дочитывается (не
+  больше drain_chars символов текста): так соединение возвращается в пул
+  keep-alive, а message_delta приносит точное число выходных токенов.
+  Если модель пишет после JSON длинное пояснение, чтение прерывается,
+  соединение закрывается, а выходные токены оцениваются по длине текста.
+"""
+
+import json
+import math
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from llm_resilience import LLMUnavailable
+
+# Ошибки в потоке, при которых проверку стоит повторить позже
+RETRYABLE_STREAM_ERRORS = {"overloaded_error", "rate_limit_error", "api_error"}
+STREAM_ERROR_RETRY_AFTER = 5.0
+# Сколько символов текста после вердикта дочитывать ради keep-alive и usage
+DEFAULT_DRAIN_CHARS = 2000
+# Оценка выходных токенов при прерванном чтении
+CHARS_PER_OUTPUT_TOKEN = 3.0
+
+Field = Tuple[str, object]
+
+
+class JsonObjectScanner:
+    """Пошаговый поиск первого JSON-объекта в тексте."""
+
+    def __init__(self):
+        self.result: Optional[dict] = None
+        self._reset()
+
+    def _reset(self):
+        self._text: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+
+    def feed(self, chunk: str) -> List[Field]:
+        """Добавляет текст; возвращает поля верхнего уровня, завершённые в нём."""
+        fields = []
+        work, i = chunk, 0
+        while i < len(work) and self.result is None:
+            ch = work[i]
+            i += 1
+            if self._depth == 0:
+                if ch == "{":
+                    self._text = ["{"]
+                    self._depth = 1
+                    self._member_start = 1
+                continue
+
+            self._text.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    field = self._member(len(self._text) - 1)
+                    if field is not None:
+                        fields.append(field)
+                    candidate = "".join(self._text)
+                    try:
+                        parsed = json.loads(candidate)
+                    except json.JSONDecodeError:
+                        parsed = None
+                    if isinstance(parsed, dict):
+                        self.result = parsed
+                    else:
+                        # Не JSON (например, "{" в тексте перед ответом): ищем дальше
+                        work, i = candidate[1:] + work[i:], 0
+                        self._reset()
+            elif ch == "," and self._depth == 1:
+                field = self._member(len(self._text) - 1)
+                if field is not None:
+                    fields.append(field)
+                self._member_start = len(self._text)
+        return fields
+
+    def _member(self, end: int) -> Optional[Field]:
+        """Поле "ключ": значение между member_start и end, если оно разбирается."""
+        text = "".join(self._text[self._member_start:end]).strip()
+        if not text:
+            return None
+        try:
+            member = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            return None
+        return next(iter(member.items())) if len(member) == 1 else None
+
+
+def extract_json_object(text: str) -> Optional[dict]:
+    """Первый JSON-объект в тексте или None."""
+    scanner = JsonObjectScanner()
+    scanner.feed(text)
+    return scanner.result
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """События server-sent events: (event, data)."""
+    event, data = "message", []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue  # комментарий (keep-alive)
+        else:
+            name, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if name == "event":
+                event = value
+            elif name == "data":
+                data.append(value)
+    if data:
+        yield event, "\n".join(data)
+
+
+def read_message_stream(lines: Iterable[str],
+                        on_field: Optional[Callable[[str, object], None]] = None,
+                        drain_chars: int = DEFAULT_DRAIN_CHARS) -> Tuple[Optional[dict], dict]:
+    """
+    Читает поток Messages API.
+
+    Возвращает (вердикт или None, usage). on_field(ключ, значение)
+    вызывается для каждого завершённого поля вердикта. После вердикта поток
+    дочитывается до конца, если текста после него не больше drain_chars;
+    иначе чтение прерывается и output_tokens оценивается по длине текста.
+    """
+    scanner = JsonObjectScanner()
+    usage = {}
+    output_chars = 0
+    trailing_chars = 0
+    for event, data in iter_sse(lines):
+        payload = json.loads(data) if data else {}
+        kind = payload.get("type", event)
+
+        if kind == "message_start":
+            usage.update(payload.get("message", {}).get("usage") or {})
+        elif kind == "content_block_delta":
+            text = payload.get("delta", {}).get("text", "")
+            output_chars += len(text)
+            if scanner.result is not None:
+                trailing_chars += len(text)
+                if trailing_chars > drain_chars:
+                    # Длинное пояснение после JSON: не ждём его ценой соединения
+                    usage["output_tokens"] = math.ceil(output_chars / CHARS_PER_OUTPUT_TOKEN)
+                    break
+                continue
+            for key, value in scanner.feed(text):
+                if on_field is not None:
+                    on_field(key, value)
+        elif kind == "message_delta":
+            usage.update(payload.get("usage") or {})
+        elif kind == "error":
+            error = payload.get("error", {})
+            message = f"Ошибка в потоке LLM API: {error.get('type')}: {error.get('message', '')}"
+            if error.get("type") in RETRYABLE_STREAM_ERRORS:
+                raise LLMUnavailable(message, retry_after=STREAM_ERROR_RETRY_AFTER)
+            raise RuntimeError(message)
+        # message_stop не прерывает цикл: тело дочитывается до конца, чтобы
+        # httpx вернул соединение в пул
+
+    return scanner.result, usage
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест HTTP-сервера ДЗ-чекера.
+
+Открытая модель нагрузки: запросы отправляются с заданной частотой (--rps)
+в течение --duration секунд независимо от того, успел ли сервер ответить
+на предыдущие, — так видна очередь и хвостовая задержка, как при дедлайне
+сдачи ДЗ. Тело запроса — examples/request_example.json; с --unique-ratio
+часть ответов делается уникальной, чтобы не попадать в кэш результатов.
+
+Перед нагрузкой отправляется один пробный запрос: если чекер отвечает
+ошибкой (например, 500 из-за сломанного шаблона промпта), тест
+останавливается и печатает ответ сервера, а не отчёт со 100% ошибок.
+
+Отчёт: пропускная способность, p50/p95/p99 задержки успешных ответов,
+доли ошибок по кодам. С --json — то же в машиночитаемом виде. Задержка
+считается от запланированного момента отправки, а не от фактического:
+если все --concurrency потоков генератора заняты, ожидание свободного
+потока тоже входит в задержку (иначе хвост занижается — coordinated omission).
+
+Использование:
+    python3 loadtest/load_test.py --url http://127.0.0.1:8080/check --rps 20 --duration 30
+    python3 loadtest/load_test.py --rps 50 --duration 60 --unique-ratio 1 --json results.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+AGENT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_REQUEST = AGENT_ROOT / "examples" / "request_example.json"
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Перцентиль q (0..100) по уже отсортированным значениям (nearest-rank)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def send_request(url: str, body: bytes, timeout: float,
+                 scheduled: Optional[float] = None) -> Tuple[str, float]:
+    """
+    Один запрос: (статус или тип ошибки, задержка в секундах).
+
+    scheduled — запланированный момент отправки (time.perf_counter()),
+    от него считается задержка; по умолчанию — момент вызова.
+    """
+    started = time.perf_counter() if scheduled is None else scheduled
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = str(response.status)
+    except urllib.error.HTTPError as e:
+        status = str(e.code)
+    except (urllib.error.URLError, OSError) as e:
+        status = type(getattr(e, "reason", e)).__name__
+    return status, time.perf_counter() - started
+
+
+def preflight(url: str, request: dict, timeout: float) -> Optional[str]:
+    """Пробный запрос: None при успехе, иначе описание ошибки с телом ответа."""
+    payload = dict(request, answer_text=f"{request['answer_text']} [preflight]")
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    http_request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            response.read()
+            return None
+    except urllib.error.HTTPError as e:
+        return f"HTTP {e.code}: {e.read().decode('utf-8', errors='replace')[:500]}"
+    except (urllib.error.URLError, OSError) as e:
+        return f"{type(getattr(e, 'reason', e)).__name__}: {getattr(e, 'reason', e)}"
+
+
+def run_load(url: str, request: dict, rps: float, duration: float, concurrency: int,
+             unique_ratio: float, timeout: float) -> Dict:
+    """Отправляет rps * duration запросов по расписанию и собирает статистику."""
+    total = int(rps * duration)
+    unique_every = int(round(1 / unique_ratio)) if unique_ratio > 0 else 0
+    results = []
+    lock = threading.Lock()
+
+    def worker(index: int, scheduled: float):
+        payload = dict(request)
+        if unique_every and index % unique_every == 0:
+            payload["answer_text"] = f"{request['answer_text']} [{index}]"
+        status, latency = send_request(url, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                                       timeout, scheduled)
+        with lock:
+            results.append((status, latency))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for index in range(total):
+            # Открытая модель: отправка по расписанию, а не по готовности ответа
+            scheduled = started + index / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(worker, index, scheduled)
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for status, latency in results if status.startswith("2"))
+    statuses = Counter(status for status, _ in results)
+    errors = sum(n for status, n in statuses.items() if not status.startswith("2"))
+
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "url": url,
+        "target_rps": rps,
+        "duration_s": round(elapsed, 2),
+        "requests": len(results),
+        "succeeded": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+def print_report(report: Dict):
+    latency = report["latency_ms"]
+    print("📊 Результаты нагрузочного теста")
+    print("━" * 50)
+    print(f"URL:                {report['url']}")
+    print(f"Запросов:           {report['requests']} за {report['duration_s']} с "
+          f"(цель {report['target_rps']} rps)")
+    print(f"Пропускная способность: {report['throughput_rps']} успешных/с")
+    print(f"Задержка, мс:       p50 {latency['p50']}  p95 {latency['p95']}  "
+          f"p99 {latency['p99']}  max {latency['max']}")
+    print(f"Ошибки:             {report['error_rate']:.1%}")
+    for status, count in report["statuses"].items():
+        print(f"  {status}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест ДЗ-чекера")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8080/check", help="Endpoint проверки")
+    parser.add_argument("--request", type=Path, default=DEFAULT_REQUEST, help="JSON-файл запроса")
+    parser.add_argument("--rps", type=float, default=10, help="Целевая частота запросов в секунду")
+    parser.add_argument("--duration", type=float, default=30, help="Длительность теста, секунд")
+    parser.add_argument("--concurrency", type=int, default=256,
+                        help="Максимум одновременно открытых запросов генератора")
+    parser.add_argument("--unique-ratio", type=float, default=1.0,
+                        help="Доля запросов с уникальным answer_text (0 — все одинаковые, кэш)")
+    parser.add_argument("--timeout", type=float, default=120, help="Таймаут запроса, секунд")
+    parser.add_argument("--json", type=Path, help="Сохранить результаты в JSON")
+    parser.add_argument("--no-preflight", action="store_true", help="Не отправлять пробный запрос")
+
+    args = parser.parse_args()
+
+    with open(args.request, "r", encoding="utf-8") as f:
+        request = json.load(f)
+
+    if not args.no_preflight:
+        error = preflight(args.url, request, args.timeout)
+        if error is not None:
+            print(f"[ERROR] Пробный запрос не прошёл, нагрузка не запускается: {error}", file=sys.stderr)
+            sys.exit(1)
+
+    print(f"[INFO] {args.rps:g} rps × {args.duration:g} с → {args.url}", file=sys.stderr)
+    report = run_load(args.url, request, args.rps, args.duration, args.concurrency,
+                      args.unique_ratio, args.timeout)
+    print_report(report)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n📝 Результаты: {args.json}")
+
+    if report["requests"] and report["succeeded"] == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
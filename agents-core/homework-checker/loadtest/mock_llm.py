@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Локальная заглушка Anthropic Messages API для нагрузочных тестов ДЗ-чекера.
+
+Отвечает на POST /v1/messages в формате Anthropic (content[0].text с JSON
+вердикта, usage с числом токенов) с настраиваемой задержкой и долей ошибок,
+чтобы измерять пропускную способность server.py без затрат на API.
+
+Задержка — логнормальная: медиана --latency-ms, разброс --latency-sigma
+(0 — фиксированная). Ошибки — с вероятностью --error-rate случайный код из
+--error-codes; для 429/529 добавляется заголовок retry-after.
+
+Запрос со "stream": true получает server-sent events, как у настоящего API
+(message_start, content_block_delta по --stream-chunk символов, message_delta,
+message_stop); задержка распределяется по частям. --trailing-chars добавляет
+после JSON пояснительный текст — на нём видна экономия от досрочного
+завершения чтения в call_llm.
+
+Использование:
+    python3 loadtest/mock_llm.py --port 8090 --latency-ms 800 --latency-sigma 0.5 --error-rate 0.02
+
+    # config.local.yaml чекера:
+    #   llm:
+    #     base_url: http://127.0.0.1:8090
+    ANTHROPIC_API_KEY=mock python3 server.py --port 8080
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_VERDICT = {
+    "verdict": "accepted",
+    "score": 82,
+    "strengths": [
+        "Ответ содержит ключевую идею",
+        "Приведён собственный пример"
+    ],
+    "issues": [
+        {
+            "criterion": "terminology",
+            "issue": "Терминология курса использована не полностью",
+            "suggestion": "Используйте термины из материалов курса"
+        }
+    ],
+    "next_step": "Приведите ещё один пример из другой области"
+}
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Обработчик POST /v1/messages с задержкой и ошибками по настройкам сервера."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, как у настоящего API
+
+    def do_POST(self):
+        settings = self.server.settings
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error"}})
+            return
+
+        with self.server.rng_lock:
+            delay = settings.latency_ms / 1000.0
+            if settings.latency_sigma > 0:
+                delay *= math.exp(self.server.rng.gauss(0, settings.latency_sigma))
+            failed = self.server.rng.random() < settings.error_rate
+            error_code = self.server.rng.choice(settings.error_codes) if failed else None
+
+        if error_code is not None:
+            time.sleep(delay)
+            headers = {"retry-after": str(settings.retry_after)} if error_code in (429, 529) else {}
+            self._send_json(error_code, {"type": "error", "error": {"type": "mock_error"}}, headers)
+            return
+
+        try:
+            request = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self._send_json(400, {"type": "error", "error": {"type": "invalid_request_error"}})
+            return
+
+        text = json.dumps(MOCK_VERDICT, ensure_ascii=False)
+        if settings.trailing_chars:
+            explanation = "ответ разобран по критериям рубрики. " * (settings.trailing_chars // 38 + 1)
+            text += "\n\n" + explanation[:settings.trailing_chars]
+        prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+        prompt_chars += len(request.get("system", ""))
+        if request.get("stream"):
+            self._send_stream(request, text, prompt_chars // 4, delay)
+            return
+        time.sleep(delay)
+        self._send_json(200, {
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "mock"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": prompt_chars // 4, "output_tokens": len(text) // 4},
+        })
+
+    def _send_stream(self, request: dict, text: str, input_tokens: int, delay: float):
+        """Ответ server-sent events; конец потока — закрытие соединения."""
+        chunk = max(1, self.server.settings.stream_chunk)
+        pieces = [text[i:i + chunk] for i in range(0, len(text), chunk)]
+        events = [("message_start", {"type": "message_start", "message": {
+            "id": "msg_mock", "type": "message", "role": "assistant", "model": request.get("model", "mock"),
+            "content": [], "usage": {"input_tokens": input_tokens, "output_tokens": 1}}})]
+        events.append(("content_block_start", {"type": "content_block_start", "index": 0,
+                                               "content_block": {"type": "text", "text": ""}}))
+        events.extend(("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                               "delta": {"type": "text_delta", "text": piece}})
+                      for piece in pieces)
+        events.append(("content_block_stop", {"type": "content_block_stop", "index": 0}))
+        events.append(("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                                         "usage": {"output_tokens": len(text) // 4}}))
+        events.append(("message_stop", {"type": "message_stop"}))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event, data in events:
+                if event == "content_block_delta":
+                    time.sleep(delay / len(pieces))
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # клиент получил вердикт и закрыл поток
+
+    def _send_json(self, status: int, data: dict, headers: dict = None):
+        response_body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", len(response_body))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def log_message(self, format, *args):
+        if self.server.settings.verbose:
+            print(f"[MOCK] {self.address_string()} - {format % args}", file=sys.stderr)
+
+
+def create_server(host: str, port: int, settings: argparse.Namespace) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.settings = settings
+    server.rng = random.Random(settings.seed)
+    server.rng_lock = threading.Lock()
+    return server
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Заглушка Anthropic Messages API")
+    parser.add_argument("--port", "-p", type=int, default=8090, help="Порт")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Хост")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Медиана задержки ответа, мс")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                        help="Разброс логнормальной задержки (0 — фиксированная)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов с ошибкой (0..1)")
+    parser.add_argument("--error-codes", type=lambda s: [int(c) for c in s.split(",")],
+                        default=[429, 500, 529], help="Коды ошибок через запятую")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry-after для 429/529, секунд")
+    parser.add_argument("--stream-chunk", type=int, default=16, help="Символов в одном событии потока")
+    parser.add_argument("--trailing-chars", type=int, default=0,
+                        help="Пояснительный текст после JSON вердикта, символов")
+    parser.add_argument("--seed", type=int, help="Seed генератора случайных чисел")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Логировать запросы")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    server = create_server(args.host, args.port, args)
+    print(f"[INFO] Заглушка LLM на http://{args.host}:{args.port}/v1/messages "
+          f"(задержка {args.latency_ms:g} мс, sigma {args.latency_sigma:g}, ошибки {args.error_rate:.0%})",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Остановка заглушки...", file=sys.stderr)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Метрики ДЗ-чекера в формате Prometheus (text exposition 0.0.4).
+
+Без внешних зависимостей: счётчики, гистограммы и gauge-функции хранятся
+в одном реестре процесса (REGISTRY), сервер отдаёт их на GET /metrics,
+если в конфигурации metrics.enabled: true.
+
+Этапы проверки размечаются контекстным менеджером:
+
+    with observe_stage("llm_call"):
+        response = client.post(...)
+
+Этапы: context_load, prompt_build, llm_call, json_extraction,
+comment_formatting и total (вся check_answer).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Секунды: от быстрых этапов (контекст, форматирование) до вызова LLM
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Монотонный счётчик с метками."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Гистограмма с кумулятивными бакетами, суммой и числом наблюдений."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, list] = {}  # [counts по бакетам..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """Gauge, значения которого считываются функцией в момент отдачи метрик."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._collect: Callable[[], Dict[LabelValues, float]] = dict
+
+    def set_function(self, collect: Callable[[], Dict[LabelValues, float]]):
+        """collect() возвращает {значения меток: значение}; для gauge без меток — {(): значение}."""
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for values, value in sorted(self._collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "homework_checker_http_requests_total", "HTTP-запросы по endpoint и коду ответа", ("endpoint", "code")))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "homework_checker_stage_duration_seconds", "Длительность этапов проверки", ("stage",)))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "homework_checker_llm_tokens_total", "Токены LLM по типу (input/output)", ("type",)))
+LLM_ATTEMPTS = REGISTRY.register(Counter(
+    "homework_checker_llm_attempts_total",
+    "Исходы обращений к LLM API (ok/client_error/retry/failed/rejected/hedge)", ("outcome",)))
+LLM_CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    "homework_checker_llm_circuit_open", "Breaker LLM API открыт (1) или закрыт (0)"))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "homework_checker_cache_lookups_total", "Обращения к кэшу результатов (hit/miss)", ("result",)))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "homework_checker_cache_hit_ratio", "Доля попаданий в кэш результатов с запуска"))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "homework_checker_checks_in_flight", "Проверки, выполняющиеся сейчас"))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "homework_checker_checks_queued", "Проверки, ожидающие свободного потока"))
+JOBS = REGISTRY.register(Gauge(
+    "homework_checker_jobs", "Асинхронные задания по статусу", ("status",)))
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Записывает длительность блока в гистограмму этапов."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage)
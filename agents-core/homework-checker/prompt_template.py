@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Сборка промпта проверки с учётом бюджета токенов.
+
+- compile_template: шаблон check_template.txt разбирается один раз на
+  статические части и поля ({question_text}, {answer_text},
+  {normative_content}, {rubric_criteria}); остальные фигурные скобки (пример
+  JSON в инструкции) остаются текстом, поэтому str.format не нужен.
+  Оценка токенов статических частей считается при компиляции.
+- estimate_tokens: оценка числа токенов по длине текста (chars_per_token);
+  токенизатор модели не нужен, а для бюджета достаточно оценки с запасом.
+- truncate_to_tokens: обрезка по границе абзаца, предложения или слова,
+  а не посреди фразы, с пометкой об обрезке.
+- normative_block: норматив раздела, обрезанный под max_normative_tokens,
+  кэшируется по (курс, раздел).
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+TEMPLATE_FIELDS = ("question_text", "answer_text", "normative_content", "rubric_criteria")
+DEFAULT_CHARS_PER_TOKEN = 3.0
+DEFAULT_MAX_NORMATIVE_TOKENS = 3000
+DEFAULT_CONTEXT_WINDOW = 200000
+# Запас на служебные токены сообщений и погрешность оценки
+DEFAULT_SAFETY_MARGIN_TOKENS = 500
+
+TRUNCATION_MARK = "\n\n[…норматив сокращён…]"
+
+_FIELD = re.compile(r"\{(" + "|".join(TEMPLATE_FIELDS) + r")\}")
+_SENTENCE_END = re.compile(r"[.!?…](?:\s|$)")
+
+
+def estimate_tokens(text: str, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """Оценка числа токенов текста."""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+class CompiledTemplate:
+    """Шаблон, разобранный на статические части и поля."""
+
+    def __init__(self, text: str):
+        self.parts: List[Tuple[bool, str]] = []  # (это поле?, текст или имя поля)
+        position = 0
+        for match in _FIELD.finditer(text):
+            if match.start() > position:
+                self.parts.append((False, text[position:match.start()]))
+            self.parts.append((True, match.group(1)))
+            position = match.end()
+        if position < len(text):
+            self.parts.append((False, text[position:]))
+
+        self.static_chars = sum(len(value) for is_field, value in self.parts if not is_field)
+
+    def static_tokens(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+        return math.ceil(self.static_chars / chars_per_token)
+
+    def render(self, **values: str) -> str:
+        return "".join(values.get(value, "") if is_field else value for is_field, value in self.parts)
+
+
+@lru_cache(maxsize=16)
+def compile_template(text: str) -> CompiledTemplate:
+    """Скомпилированный шаблон; повторные вызовы с тем же текстом берутся из кэша."""
+    return CompiledTemplate(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int,
+                       chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> str:
+    """
+    Текст, укладывающийся в max_tokens.
+
+    Обрезается по последней границе абзаца, иначе предложения, иначе слова
+    в пределах бюджета; в конец добавляется TRUNCATION_MARK.
+    """
+    if estimate_tokens(text, chars_per_token) <= max_tokens:
+        return text
+
+    limit = int(max_tokens * chars_per_token) - len(TRUNCATION_MARK)
+    if limit <= 0:
+        return ""
+    head = text[:limit]
+
+    # Граница абзаца не раньше половины бюджета, иначе теряется слишком много
+    cut = head.rfind("\n\n")
+    if cut < limit // 2:
+        sentence_ends = [m.end() for m in _SENTENCE_END.finditer(head)]
+        cut = sentence_ends[-1] if sentence_ends and sentence_ends[-1] >= limit // 2 else -1
+    if cut < limit // 2:
+        cut = head.rfind(" ")
+    if cut <= 0:
+        cut = limit
+
+    return head[:cut].rstrip() + TRUNCATION_MARK
+
+
+@lru_cache(maxsize=1024)
+def normative_block(course_name: str, section_name: str, normative_content: str,
+                    max_tokens: int, chars_per_token: float) -> str:
+    """Норматив раздела в пределах max_tokens (кэш по курсу и разделу)."""
+    return truncate_to_tokens(normative_content, max_tokens, chars_per_token)
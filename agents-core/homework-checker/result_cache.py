@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Кэш результатов проверки ДЗ.
+
+Повторная отправка того же ответа на тот же вопрос (пересдача, копипаст)
+не должна заново вызывать LLM. Ключ кэша — хэш нормализованного запроса
+(question_text, answer_text, course_name, section_name), рубрики, промптов,
+настроек модели и норматива раздела (текст руководства, попавший в промпт):
+при изменении любой из этих частей, в том числе после правки руководства,
+результат считается заново.
+
+Кэшируется ответ LLM (вердикт, score, замечания), а не готовый комментарий:
+format_comment дешёвый и всегда применяется с текущей конфигурацией.
+
+Хранение: LRU в памяти с TTL (max_entries, ttl) и, опционально, SQLite
+(sqlite_path) — тогда кэш переживает перезапуск сервера и общий для CLI.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL = 7 * 24 * 3600
+
+REQUEST_KEY_FIELDS = ("question_text", "answer_text", "course_name", "section_name")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def cache_key(request: dict, rubric: Optional[dict], prompts: dict, llm_config: dict,
+              normative_content: str = "") -> str:
+    """Хэш нормализованного запроса, рубрики, промптов, настроек модели и норматива."""
+    payload = {
+        "request": {field: _normalize(request.get(field, "")) for field in REQUEST_KEY_FIELDS},
+        "rubric": rubric or {},
+        "prompts": prompts,
+        "llm": {k: llm_config.get(k) for k in ("provider", "model", "max_tokens", "temperature")},
+        "normative": hashlib.sha256(normative_content.encode("utf-8")).hexdigest(),
+    }
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Потокобезопасный LRU-кэш с TTL и опциональным хранением в SQLite."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 sqlite_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        if sqlite_path is not None:
+            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(sqlite_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM results WHERE key = ? AND expires_at >= ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[1], json.loads(row[0]))
+                    self._store(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: dict):
+        entry = (time.time() + self.ttl, value)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), entry[0]),
+                )
+                self._db.commit()
+
+    def _store(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
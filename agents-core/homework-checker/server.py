@@ -4,22 +4,144 @@ HTTP-сервер ДЗ-чекера v0.1.
 
 Синхронный endpoint для приёма запросов от LMS.
 
+Каждое соединение обслуживается в своём потоке (ThreadingHTTPServer), а сами
+проверки выполняются в ограниченном пуле CheckPool: не более max_in_flight
+одновременно и не более max_queue в очереди. Медленный вызов LLM не блокирует
+другие запросы и /health; при переполненной очереди сервер отвечает 503.
+Если LLM API не ответил после повторов или его circuit breaker открыт
+(см. llm_resilience.py), POST /check тоже отвечает 503 с Retry-After.
+
+POST /check/batch принимает список запросов и проверяет их параллельно (не
+более server.batch_concurrency одновременно на пакет). Результаты
+возвращаются в порядке запросов или, с ?stream=ndjson, построчно по мере
+готовности.
+
+POST /jobs ставит проверку в очередь и сразу возвращает job_id (202);
+статус и результат — GET /jobs/<id>, по завершении — опциональный webhook
+на callback_url (см. jobs.py).
+
+GET /metrics (при metrics.enabled) отдаёт метрики в формате Prometheus:
+запросы, проверки в работе и в очереди, длительность этапов проверки,
+токены LLM и попадания в кэш (см. metrics.py).
+
 Использование:
     python3 server.py --port 8080
+    python3 server.py --port 8080 --max-in-flight 16 --max-queue 200
 """
 
 import argparse
 import json
+import math
+import queue
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
 # Импортируем функции из check.py
-from check import check_answer, load_config, load_prompts
+from check import (check_answer, create_context_store, create_llm_client, create_result_cache,
+                   load_config, load_prompts)
+from llm_resilience import LLMUnavailable
+from jobs import (DEFAULT_JOB_TTL, DEFAULT_WEBHOOK_TIMEOUT, DEFAULT_WEBHOOK_WORKERS, JobStore, WebhookSender,
+                  check_callback_url, run_job)
+import metrics
 
 AGENT_ROOT = Path(__file__).parent
 DEFAULT_CONFIG = AGENT_ROOT / "config.yaml"
 
+# Значения по умолчанию, если в конфигурации нет секции server
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_MAX_BATCH = 1000
+
+# Пути для метки endpoint в метриках (id заданий не должны плодить серии)
+METRIC_ENDPOINTS = {"/check", "/check/batch", "/jobs", "/health", "/metrics"}
+
+REQUIRED_FIELDS = ["answer_text", "question_text", "course_name", "section_name"]
+
+
+def missing_fields(request) -> List[str]:
+    """Обязательные поля, которых нет в запросе на проверку."""
+    if not isinstance(request, dict):
+        return list(REQUIRED_FIELDS)
+    return [f for f in REQUIRED_FIELDS if f not in request]
+
+
+class QueueFull(Exception):
+    """Пул проверок и очередь заполнены."""
+
+
+class ClientDisconnected(Exception):
+    """Клиент закрыл соединение до конца потокового ответа."""
+
+
+class CheckPool:
+    """
+    Ограниченный пул проверок.
+
+    Не более max_in_flight проверок выполняются одновременно, ещё не более
+    max_queue ждут свободного потока; сверх этого submit() бросает QueueFull,
+    чтобы сервер сразу ответил 503, а не копил соединения.
+
+    Последние reserved мест очереди доступны только неблокирующим
+    (одиночным) проверкам: пакеты, ждущие места с block=True, не могут
+    занять всю очередь и вытеснить POST /check в 503.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, reserved: Optional[int] = None):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        if reserved is None:
+            reserved = max_queue // 4
+        self.reserved = max(0, min(reserved, max_in_flight + max_queue - 1))
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="check")
+        self._lock = threading.Lock()
+        self._capacity = threading.Condition(self._lock)
+        self._pending = 0   # в очереди + выполняются
+        self._running = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return self._pending - self._running
+
+    def submit(self, fn, *args, block: bool = False, **kwargs) -> Future:
+        """
+        Поставить проверку в пул.
+
+        При заполненной очереди бросает QueueFull, а с block=True ждёт
+        свободного места (так пакетные проверки создают backpressure).
+        """
+        limit = self.max_in_flight + self.max_queue - (self.reserved if block else 0)
+        with self._capacity:
+            while self._pending >= limit:
+                if not block:
+                    raise QueueFull()
+                self._capacity.wait()
+            self._pending += 1
+
+        def run():
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._capacity:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._capacity.notify()
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
 
 class CheckHandler(BaseHTTPRequestHandler):
     """HTTP-обработчик запросов на проверку."""
@@ -27,61 +149,391 @@ class CheckHandler(BaseHTTPRequestHandler):
     # Загружаем конфигурацию и промпты один раз
     config = None
     prompts = None
+    pool = None
+    llm_client = None
+    result_cache = None
+    context_store = None
+    metrics_enabled = False
+    batch_concurrency = DEFAULT_MAX_IN_FLIGHT
+    max_batch = DEFAULT_MAX_BATCH
+    jobs = None
+    webhooks = None
+    callback_hosts = []
 
     @classmethod
-    def initialize(cls, config_path: Path = DEFAULT_CONFIG):
-        """Инициализация конфигурации."""
+    def initialize(cls, config_path: Path = DEFAULT_CONFIG,
+                   max_in_flight: int = None, max_queue: int = None):
+        """Инициализация конфигурации, клиента LLM и пула проверок."""
         cls.config = load_config(config_path)
         cls.prompts = load_prompts(cls.config)
         print(f"[INFO] Конфигурация загружена из {config_path}", file=sys.stderr)
 
+        # Рубрики и карта вопросов загружаются один раз (с горячей перезагрузкой)
+        cls.context_store = create_context_store(cls.config)
+
+        # Кэш результатов для повторных отправок (секция cache)
+        cls.result_cache = create_result_cache(cls.config)
+        if cls.result_cache is not None:
+            print(f"[INFO] Кэш результатов: до {cls.result_cache.max_entries} записей, "
+                  f"TTL {cls.result_cache.ttl} с", file=sys.stderr)
+
+        server_config = cls.config.get("server", {})
+        cls.pool = CheckPool(
+            max_in_flight=max_in_flight or server_config.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+            max_queue=max_queue if max_queue is not None else server_config.get("max_queue", DEFAULT_MAX_QUEUE),
+            reserved=server_config.get("reserved_for_single"),
+        )
+        print(f"[INFO] Пул проверок: {cls.pool.max_in_flight} одновременно, "
+              f"очередь до {cls.pool.max_queue} (из них {cls.pool.reserved} — только для /check)",
+              file=sys.stderr)
+
+        # Один клиент с пулом keep-alive соединений на все проверки
+        cls.llm_client = create_llm_client(cls.config, max_concurrency=cls.pool.max_in_flight)
+
+        cls.batch_concurrency = server_config.get("batch_concurrency", cls.pool.max_in_flight)
+        cls.max_batch = server_config.get("max_batch", DEFAULT_MAX_BATCH)
+
+        jobs_config = server_config.get("jobs", {})
+        cls.jobs = JobStore(ttl=jobs_config.get("ttl", DEFAULT_JOB_TTL))
+        cls.webhooks = WebhookSender(
+            timeout=jobs_config.get("webhook_timeout", DEFAULT_WEBHOOK_TIMEOUT),
+            max_workers=jobs_config.get("webhook_workers", DEFAULT_WEBHOOK_WORKERS),
+        )
+        cls.callback_hosts = list(jobs_config.get("callback_hosts") or [])
+
+        metrics_config = cls.config.get("metrics", {})
+        cls.metrics_enabled = bool(metrics_config.get("enabled", False))
+        if cls.metrics_enabled and metrics_config.get("backend", "prometheus") != "prometheus":
+            print(f"[WARN] Бэкенд метрик {metrics_config['backend']} не поддерживается, "
+                  f"используется prometheus (GET /metrics)", file=sys.stderr)
+        metrics.IN_FLIGHT.set_function(lambda: {(): cls.pool.in_flight})
+        metrics.QUEUE_DEPTH.set_function(lambda: {(): cls.pool.queued})
+        metrics.JOBS.set_function(lambda: {(status,): n for status, n in cls.jobs.counts().items()})
+        if cls.result_cache is not None:
+            metrics.CACHE_HIT_RATIO.set_function(lambda: {(): cls.result_cache.stats()["hit_ratio"]})
+        if cls.llm_client is not None:
+            metrics.LLM_CIRCUIT_OPEN.set_function(
+                lambda: {(): int(cls.llm_client.breaker.state != "closed")})
+
+    def _check_args(self, request: dict) -> tuple:
+        """Аргументы check_answer для запроса: общие конфигурация, клиент, кэш, контекст."""
+        return (request, self.config, self.prompts, self.llm_client,
+                self.result_cache, self.context_store)
+
     def do_POST(self):
-        """Обработка POST-запроса на /check."""
-        if self.path != "/check":
+        """Обработка POST-запросов на /check, /check/batch и /jobs."""
+        url = urlparse(self.path)
+        if url.path == "/check":
+            self._handle_check(parse_qs(url.query))
+        elif url.path == "/check/batch":
+            self._handle_batch(parse_qs(url.query))
+        elif url.path == "/jobs":
+            self._handle_submit_job()
+        else:
             self.send_error(404, "Not Found")
-            return
 
-        # Читаем тело запроса
+    def _read_json(self):
+        """Тело запроса как JSON; при ошибке отправляет 400 и возвращает None."""
         content_length = int(self.headers.get("Content-Length", 0))
         if content_length == 0:
             self.send_error(400, "Empty request body")
-            return
+            return None
 
         try:
             body = self.rfile.read(content_length)
-            request = json.loads(body.decode("utf-8"))
+            return json.loads(body.decode("utf-8"))
         except json.JSONDecodeError as e:
             self.send_error(400, f"Invalid JSON: {e}")
+            return None
+
+    def _send_json(self, status: int, data):
+        response_body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", len(response_body))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def _send_queue_full(self):
+        print("[WARN] Очередь проверок заполнена, запрос отклонён", file=sys.stderr)
+        self.send_response(503)
+        self.send_header("Retry-After", "5")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_unavailable(self, error: LLMUnavailable):
+        """503 с Retry-After: LLM API перегружен или недоступен."""
+        response_body = json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8")
+        self.send_response(503)
+        self.send_header("Retry-After", str(max(1, math.ceil(error.retry_after))))
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", len(response_body))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def _handle_check(self, query: dict):
+        """
+        POST /check: синхронная проверка одного ответа.
+
+        С ?stream=text (или Accept: text/markdown) вместо JSON отдаётся сам
+        комментарий в Markdown частями (chunked) по мере разбора вердикта.
+        """
+        request = self._read_json()
+        if request is None:
             return
 
         # Валидация обязательных полей
-        required_fields = ["answer_text", "question_text", "course_name", "section_name"]
-        missing = [f for f in required_fields if f not in request]
+        missing = missing_fields(request)
         if missing:
             self.send_error(400, f"Missing required fields: {missing}")
             return
 
-        # Проверка
+        if query.get("stream", [""])[0] == "text" or "text/markdown" in self.headers.get("Accept", ""):
+            self._handle_check_stream(request)
+            return
+
+        # Проверка в пуле: поток соединения только ждёт результат
+        try:
+            future = self.pool.submit(check_answer, *self._check_args(request))
+        except QueueFull:
+            self._send_queue_full()
+            return
+
         try:
-            result = check_answer(request, self.config, self.prompts)
+            result = future.result()
+        except LLMUnavailable as e:
+            print(f"[WARN] Проверка отложена: {e}", file=sys.stderr)
+            self._send_unavailable(e)
+            return
         except Exception as e:
             print(f"[ERROR] Ошибка проверки: {e}", file=sys.stderr)
             self.send_error(500, f"Internal error: {e}")
             return
 
-        # Отправляем ответ
-        response_body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self._send_json(200, result)
+
+    def _handle_check_stream(self, request: dict):
+        """
+        Комментарий частями: Transfer-Encoding: chunked, HTTP/1.1.
+
+        Заголовки отправляются с первой частью, поэтому ошибка до неё — обычный
+        ответ 503/500. Ошибка после неё обрывает ответ без завершающего
+        chunk — LMS видит неполный ответ, а не обрезанный комментарий.
+
+        Если клиент отключился, запись прекращается, а следующая часть
+        комментария прерывает проверку (ClientDisconnected закрывает поток
+        LLM), чтобы не тратить токены на ответ, который некому отдать.
+        """
+        parts = queue.Queue()
+        disconnected = threading.Event()
+
+        def on_comment(part: str):
+            if disconnected.is_set():
+                raise ClientDisconnected("клиент отключился")
+            parts.put(part)
+
+        try:
+            future = self.pool.submit(check_answer, *self._check_args(request), on_comment=on_comment)
+        except QueueFull:
+            self._send_queue_full()
+            return
+        future.add_done_callback(lambda _: parts.put(None))
+
+        started = False
+        try:
+            while True:
+                part = parts.get()
+                if part is None:
+                    break
+                if not started:
+                    self.protocol_version = "HTTP/1.1"  # chunked есть только в HTTP/1.1
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/markdown; charset=utf-8")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    self.close_connection = True
+                    started = True
+                data = part.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+        except OSError as e:
+            print(f"[WARN] Клиент отключился во время потоковой проверки: {e}", file=sys.stderr)
+            self.close_connection = True
+            disconnected.set()
+            return
+
+        try:
+            future.result()
+        except LLMUnavailable as e:
+            print(f"[WARN] Проверка отложена: {e}", file=sys.stderr)
+            if not started:
+                self._send_unavailable(e)
+            return
+        except Exception as e:
+            print(f"[ERROR] Ошибка проверки: {e}", file=sys.stderr)
+            if not started:
+                self.send_error(500, f"Internal error: {e}")
+            return
+
+        try:
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError as e:
+            print(f"[WARN] Клиент отключился до конца потокового ответа: {e}", file=sys.stderr)
+
+    def _iter_batch(self, requests: list, stop: threading.Event) -> Iterator[Tuple[int, dict]]:
+        """
+        Проверяет пакет и отдаёт пары (индекс, результат) по мере готовности.
+
+        Не более batch_concurrency проверок пакета одновременно находятся в
+        пуле; остальные ждут, не занимая зарезервированную часть очереди
+        (CheckPool.reserved), так что одиночные запросы не получают 503 из-за
+        пакетов. Ошибка отдельного запроса возвращается как {"error": ...}.
+        После stop.set() (клиент отключился) новые проверки не ставятся.
+        """
+        done = queue.Queue()
+        slots = threading.BoundedSemaphore(self.batch_concurrency)
+
+        def on_done(index: int, future: Future):
+            slots.release()
+            try:
+                done.put((index, future.result()))
+            except Exception as e:
+                print(f"[ERROR] Ошибка проверки #{index}: {e}", file=sys.stderr)
+                done.put((index, {"error": f"Internal error: {e}"}))
+
+        def feed():
+            for index, request in enumerate(requests):
+                missing = missing_fields(request)
+                if missing:
+                    done.put((index, {"error": f"Missing required fields: {missing}"}))
+                    continue
+                slots.acquire()
+                if stop.is_set():
+                    slots.release()
+                    return
+                try:
+                    future = self.pool.submit(check_answer, *self._check_args(request), block=True)
+                except Exception as e:
+                    slots.release()
+                    print(f"[ERROR] Ошибка постановки проверки #{index}: {e}", file=sys.stderr)
+                    done.put((index, {"error": f"Internal error: {e}"}))
+                    continue
+                future.add_done_callback(lambda f, index=index: on_done(index, f))
+
+        threading.Thread(target=feed, name="batch-feed", daemon=True).start()
+        for _ in range(len(requests)):
+            yield done.get()
+
+    def _handle_batch(self, query: dict):
+        """
+        POST /check/batch: проверка списка ответов.
+
+        Тело — список запросов или {"requests": [...]}. По умолчанию ответ —
+        {"results": [...]} в порядке запросов; с ?stream=ndjson (или
+        Accept: application/x-ndjson) — строки {"index": i, ...} по мере готовности.
+        """
+        data = self._read_json()
+        if data is None:
+            return
+
+        requests = data.get("requests") if isinstance(data, dict) else data
+        if not isinstance(requests, list):
+            self.send_error(400, "Expected a list of requests or {\"requests\": [...]}")
+            return
+        if len(requests) > self.max_batch:
+            self.send_error(413, f"Batch too large: {len(requests)} > {self.max_batch}")
+            return
+
+        stream = (query.get("stream", [""])[0] == "ndjson"
+                  or "application/x-ndjson" in self.headers.get("Accept", ""))
+
+        stop = threading.Event()
+        if not stream:
+            results: List[Optional[dict]] = [None] * len(requests)
+            try:
+                for index, result in self._iter_batch(requests, stop):
+                    results[index] = result
+            finally:
+                stop.set()
+            self._send_json(200, {"results": results})
+            return
 
+        # NDJSON без Content-Length: конец ответа — закрытие соединения
         self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for index, result in self._iter_batch(requests, stop):
+                line = json.dumps({"index": index, **result}, ensure_ascii=False) + "\n"
+                self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+        except OSError as e:
+            print(f"[WARN] Клиент отключился во время пакетной проверки: {e}", file=sys.stderr)
+        finally:
+            stop.set()  # оставшиеся запросы пакета не отправляются в LLM
+
+    def _handle_submit_job(self):
+        """POST /jobs: поставить проверку в очередь, ответ 202 с job_id."""
+        request = self._read_json()
+        if request is None:
+            return
+
+        missing = missing_fields(request)
+        if missing:
+            self.send_error(400, f"Missing required fields: {missing}")
+            return
+
+        callback_url = request.get("callback_url")
+        if callback_url is not None:
+            error = check_callback_url(callback_url, self.callback_hosts)
+            if error:
+                self.send_error(400, error)
+                return
+
+        job = self.jobs.create(callback_url)
+        try:
+            self.pool.submit(run_job, self.jobs, job["job_id"], check_answer,
+                             *self._check_args(request), webhooks=self.webhooks)
+        except QueueFull:
+            self.jobs.delete(job["job_id"])
+            self._send_queue_full()
+            return
+
+        response_body = json.dumps(job, ensure_ascii=False).encode("utf-8")
+        self.send_response(202)
         self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Location", f"/jobs/{job['job_id']}")
         self.send_header("Content-Length", len(response_body))
         self.end_headers()
         self.wfile.write(response_body)
 
     def do_GET(self):
-        """Обработка GET-запроса (health check)."""
-        if self.path == "/health":
+        """Обработка GET-запросов: health check, метрики и статус задания."""
+        path = urlparse(self.path).path
+        if path == "/metrics" and self.metrics_enabled:
+            response_body = metrics.REGISTRY.render().encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", len(response_body))
+            self.end_headers()
+            self.wfile.write(response_body)
+        elif path.startswith("/jobs/"):
+            job = self.jobs.get(path[len("/jobs/"):])
+            if job is None:
+                self.send_error(404, "Job not found")
+            else:
+                self._send_json(200, job)
+        elif path == "/health":
             response = {"status": "ok", "version": "0.1"}
+            if self.result_cache is not None:
+                response["cache"] = self.result_cache.stats()
+            if self.context_store is not None and self.context_store.guides is not None:
+                response["guides"] = self.context_store.guides.stats
             response_body = json.dumps(response).encode("utf-8")
 
             self.send_response(200)
@@ -92,6 +544,13 @@ class CheckHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(404, "Not Found")
 
+    def log_request(self, code="-", size="-"):
+        """Учитываем каждый ответ в метриках запросов."""
+        path = urlparse(self.path).path if hasattr(self, "path") else ""
+        endpoint = "/jobs/{id}" if path.startswith("/jobs/") else (path if path in METRIC_ENDPOINTS else "other")
+        metrics.REQUESTS.inc(endpoint, str(int(code)) if isinstance(code, int) else str(code))
+        super().log_request(code, size)
+
     def log_message(self, format, *args):
         """Переопределяем логирование."""
         print(f"[HTTP] {self.address_string()} - {format % args}", file=sys.stderr)
@@ -102,17 +561,26 @@ def main():
     parser.add_argument("--port", "-p", type=int, default=8080, help="Порт сервера")
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Хост сервера")
     parser.add_argument("--config", "-c", type=str, help="Путь к конфигурации")
+    parser.add_argument("--max-in-flight", type=int,
+                        help="Максимум одновременных проверок (по умолчанию: server.max_in_flight)")
+    parser.add_argument("--max-queue", type=int,
+                        help="Максимум проверок в очереди (по умолчанию: server.max_queue)")
 
     args = parser.parse_args()
 
     # Инициализация
     config_path = Path(args.config) if args.config else DEFAULT_CONFIG
-    CheckHandler.initialize(config_path)
+    CheckHandler.initialize(config_path, args.max_in_flight, args.max_queue)
 
-    # Запуск сервера
-    server = HTTPServer((args.host, args.port), CheckHandler)
+    # Запуск сервера: поток на соединение, проверки — в CheckHandler.pool
+    server = ThreadingHTTPServer((args.host, args.port), CheckHandler)
+    server.daemon_threads = True
     print(f"[INFO] ДЗ-чекер v0.1 запущен на http://{args.host}:{args.port}", file=sys.stderr)
     print(f"[INFO] Endpoint: POST /check", file=sys.stderr)
+    print(f"[INFO] Endpoint: POST /check/batch", file=sys.stderr)
+    print(f"[INFO] Jobs: POST /jobs, GET /jobs/<id>", file=sys.stderr)
+    if CheckHandler.metrics_enabled:
+        print(f"[INFO] Metrics: GET /metrics", file=sys.stderr)
     print(f"[INFO] Health: GET /health", file=sys.stderr)
 
     try:
@@ -120,6 +588,15 @@ def main():
     except KeyboardInterrupt:
         print("\n[INFO] Остановка сервера...", file=sys.stderr)
         server.shutdown()
+        CheckHandler.pool.shutdown(wait=False)
+        if CheckHandler.webhooks is not None:
+            CheckHandler.webhooks.shutdown()
+        if CheckHandler.llm_client is not None:
+            CheckHandler.llm_client.close()
+        if CheckHandler.result_cache is not None:
+            CheckHandler.result_cache.close()
+        if CheckHandler.context_store is not None:
+            CheckHandler.context_store.close()
 
 
 if __name__ == "__main__":